@@ -0,0 +1,63 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from openpyxl import Workbook
+from etmExcel import write_excel
+
+HEADER = ["Project Area Name", "Project Area UUID", "Stream Name", "Stream OSLC ID", "Test Cases"]
+
+
+def synthetic_rows(count):
+    for i in range(count):
+        yield [f"Project Area {i % 500}", f"_PA{i % 500:020d}", f"Stream {i}", f"_ST{i:020d}", i % 5000]
+
+
+def export_in_memory(file_name, count):
+    """
+    The scripts' previous approach: a normal Workbook holding every row.
+    """
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Rows"
+    sheet.append(HEADER)
+    for row in synthetic_rows(count):
+        sheet.append(row)
+    workbook.save(file_name)
+
+
+def export_streaming(file_name, count):
+    write_excel(file_name, [("Rows", HEADER, synthetic_rows(count))])
+
+
+def measure(export, count):
+    """
+    Returns (seconds, peak traced MB, file MB) for one export.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "benchmark.xlsx")
+        tracemalloc.start()
+        start = time.perf_counter()
+        export(file_name, count)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return elapsed, peak / 2 ** 20, os.path.getsize(file_name) / 2 ** 20
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory and time of the streaming Excel export")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--compare-max", type=int, default=100000,
+                        help="largest row count also exported with the in-memory Workbook")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'mode':>10} {'seconds':>8} {'peak MB':>8} {'file MB':>8}")
+    for count in args.rows:
+        modes = [("streaming", export_streaming)]
+        if count <= args.compare_max:
+            modes.append(("in-memory", export_in_memory))
+        for mode, export in modes:
+            elapsed, peak, size = measure(export, count)
+            print(f"{count:>9} {mode:>10} {elapsed:>8.1f} {peak:>8.1f} {size:>8.1f}")
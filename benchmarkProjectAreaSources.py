@@ -0,0 +1,52 @@
+import argparse
+import statistics
+import time
+from etmCatalog import PROJECT_AREA_SOURCES, fetch_project_areas, parse_project_areas, reconcile_project_areas
+from etmClient import load_config, prompt_client
+
+
+def measure(client, source, repeat):
+    """
+    Fetches the project areas from one source `repeat` times.
+    Returns (project_areas, bytes per fetch, latencies in seconds).
+    """
+    latencies = []
+    bytes_read = []
+    project_areas = []
+    for _ in range(repeat):
+        before = client.stats.bytes_read
+        start = time.perf_counter()
+        project_areas = parse_project_areas(fetch_project_areas(client, source))
+        latencies.append(time.perf_counter() - start)
+        bytes_read.append(client.stats.bytes_read - before)
+    return project_areas, statistics.median(bytes_read), latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the project area sources on one server: bytes transferred and latency")
+    parser.add_argument("--repeat", type=int, default=5, help="fetches per source")
+    parser.add_argument("--sources", nargs="+", choices=PROJECT_AREA_SOURCES, default=list(PROJECT_AREA_SOURCES))
+    args = parser.parse_args()
+
+    config = load_config()
+    client = prompt_client(config)
+    # One throw-away request so both sources run on a warm, authenticated connection
+    fetch_project_areas(client, args.sources[0])
+
+    print(f"{config['server_url']}, {args.repeat} fetches per source")
+    print(f"{'source':>14} {'areas':>6} {'KB':>9} {'min ms':>8} {'median ms':>10} {'max ms':>8}")
+    results = {}
+    for source in args.sources:
+        project_areas, size, latencies = measure(client, source, args.repeat)
+        results[source] = project_areas
+        print(f"{source:>14} {len(project_areas):>6} {size / 1024:>9.1f} {min(latencies) * 1000:>8.0f} "
+              f"{statistics.median(latencies) * 1000:>10.0f} {max(latencies) * 1000:>8.0f}")
+
+    if len(results) == 2:
+        added, removed = reconcile_project_areas(*results.values())
+        if added or removed:
+            first, second = results
+            print(f"The sources differ: {len(added)} project areas only in {second}, {len(removed)} only in {first}")
+        else:
+            print("Both sources list the same project areas")
+    print(client.connection_summary())
@@ -0,0 +1,82 @@
+import argparse
+import tracemalloc
+from etmCounts import ARTIFACT_TYPES
+from etmRecords import GovernanceResult, ProjectArea, Stream
+
+STREAMS_PER_AREA = 20
+
+
+def synthetic_catalog(streams):
+    """
+    (name, uuid, [(stream name, oslc id)]) tuples; created before tracing so
+    only the containers are measured, not the strings they share.
+    """
+    areas = []
+    for area in range(-(-streams // STREAMS_PER_AREA)):
+        first = area * STREAMS_PER_AREA
+        areas.append((f"Project Area {area}", f"_pa{area:020d}",
+                      [(f"Stream {i}", f"_cfg{i:020d}") for i in range(first, min(streams, first + STREAMS_PER_AREA))]))
+    return areas
+
+
+def dict_model(catalog):
+    """
+    The scripts' dict shapes: catalog dicts with "Streams" and one flat row
+    per stream as built for the reports.
+    """
+    project_areas = []
+    rows = []
+    for name, uuid, streams in catalog:
+        area = {"Project_Area_Name": name, "Project_Area_UUID": uuid,
+                "Streams": [{"Project_Area_Stream_Name": stream_name, "Project_Area_Stream_OSLC_ID": oslc_id}
+                            for stream_name, oslc_id in streams]}
+        project_areas.append(area)
+        for stream in area["Streams"]:
+            row = {"Project_Area_Name": name, "Project_Area_UUID": uuid,
+                   "Project_Area_Stream_Name": stream["Project_Area_Stream_Name"],
+                   "Project_Area_Stream_OSLC_ID": stream["Project_Area_Stream_OSLC_ID"]}
+            for count, artifact in enumerate(ARTIFACT_TYPES):
+                row[f"{artifact}_count"] = count
+                row[f"{artifact}_status"] = "Allowed"
+            rows.append(row)
+    return project_areas, rows
+
+
+def record_model(catalog):
+    """
+    The same data as ProjectArea, Stream and GovernanceResult records.
+    """
+    project_areas = []
+    results = []
+    for name, uuid, streams in catalog:
+        area = ProjectArea(name, uuid, [Stream(stream_name, oslc_id) for stream_name, oslc_id in streams])
+        project_areas.append(area)
+        for stream in area.streams:
+            results.append(GovernanceResult(area, stream, {artifact: count for count, artifact in enumerate(ARTIFACT_TYPES)}))
+    return project_areas, results
+
+
+def traced_bytes(build, catalog):
+    tracemalloc.start()
+    try:
+        model = build(catalog)
+        size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del model
+    return size, peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory of the dict and record models of a sweep, measured with tracemalloc")
+    parser.add_argument("--streams", type=int, default=200000)
+    args = parser.parse_args()
+
+    catalog = synthetic_catalog(args.streams)
+    print(f"{args.streams} streams in {len(catalog)} project areas, {len(ARTIFACT_TYPES)} counts per stream")
+    print(f"{'model':>8} {'MB':>8} {'peak MB':>8} {'bytes/stream':>13}")
+    baseline = None
+    for label, build in (("dicts", dict_model), ("records", record_model)):
+        size, peak = traced_bytes(build, catalog)
+        baseline = baseline or size
+        print(f"{label:>8} {size / 2 ** 20:>8.1f} {peak / 2 ** 20:>8.1f} {size / args.streams:>13.0f}  ({size / baseline:.0%})")
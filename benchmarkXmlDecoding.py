@@ -0,0 +1,65 @@
+import argparse
+import os
+import time
+from etmListing import parse_xml_listing_page
+from etmPaging import iter_decoded_pages, iter_pages
+
+FIELDS = ("itemId", "name", "webId", "state", "owner", "priority", "category", "modified")
+
+
+def synthetic_page(page, page_size, total):
+    """
+    One pagedSearchResult-like XML page with page_size test case records.
+    """
+    first = page * page_size
+    ids = range(first, min(total, first + page_size))
+    results = "".join(
+        "<results>" + "".join(f"<{field}>{field}-{i}</{field}>" for field in FIELDS)
+        + "<owner_details><name>user</name><email>user@example.com</email></owner_details></results>"
+        for i in ids
+    )
+    return (f"<response><returnValue><value><totalSize>{total}</totalSize>"
+            f"<resultSetSize>{len(ids)}</resultSetSize>{results}</value></returnValue></response>").encode("utf-8")
+
+
+def run(pages, page_size, io_workers, processes, latency):
+    """
+    Enumerates the synthetic listing and returns (records, seconds).
+    latency simulates the server's response time per page.
+    """
+    def fetch_raw_page(page):
+        if latency:
+            time.sleep(latency)
+        return pages[page]
+
+    start = time.perf_counter()
+    if processes:
+        records = iter_decoded_pages(fetch_raw_page, parse_xml_listing_page, page_size, io_workers, processes)
+    else:
+        records = iter_pages(lambda page: parse_xml_listing_page(fetch_raw_page(page)), page_size, io_workers)
+    count = sum(1 for _ in records)
+    return count, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of process-pool XML decoding on a synthetic listing")
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--io-workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per page request")
+    parser.add_argument("--processes", type=int, nargs="+",
+                        help="decoder process counts to compare (default: 1, 2, 4 ... up to the CPU count)")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    process_counts = args.processes or sorted({2 ** i for i in range(cpus.bit_length()) if 2 ** i <= cpus} | {cpus})
+    page_total = -(-args.records // args.page_size)
+    pages = [synthetic_page(page, args.page_size, args.records) for page in range(page_total)]
+    print(f"{args.records} records in {page_total} pages ({sum(map(len, pages)) / 2 ** 20:.1f} MB), {cpus} CPUs")
+
+    print(f"{'decoding':>22} {'seconds':>8} {'records/s':>10}")
+    for processes in [0] + process_counts:
+        count, elapsed = run(pages, args.page_size, args.io_workers, processes, args.latency)
+        assert count == args.records, count
+        label = f"{args.io_workers} I/O threads" if not processes else f"{processes} processes"
+        print(f"{label:>22} {elapsed:>8.2f} {count / elapsed:>10.0f}")
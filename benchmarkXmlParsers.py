@@ -0,0 +1,92 @@
+import argparse
+import time
+import xml.etree.ElementTree as ET
+from etmXml import available_backends
+
+TEST_CASE_FIELDS = ("itemId", "webId", "name", "state", "owner", "priority", "category", "modified", "weight", "stateId")
+
+
+def synthetic_configurations(count):
+    """
+    IConfigurationManagementRestService pagedSearchResult shaped payload.
+    """
+    results = "".join(
+        f"<results><itemId>_cfg{i}</itemId><name>Stream {i}</name><type>stream</type>"
+        f"<component><itemId>_comp{i % 7}</itemId><name>Component</name></component></results>"
+        for i in range(count)
+    )
+    return (f"<response><returnValue><value><totalSize>{count}</totalSize><resultSetSize>{count}</resultSetSize>"
+            f"{results}</value></returnValue></response>").encode("utf-8")
+
+
+def synthetic_test_cases(count):
+    """
+    ITestCaseRestService pagedSearchResult shaped payload.
+    """
+    results = "".join(
+        "<results>" + "".join(f"<{field}>{field}-{i}</{field}>" for field in TEST_CASE_FIELDS)
+        + "<categories><category><name>Level</name><value>System</value></category></categories></results>"
+        for i in range(count)
+    )
+    return (f"<response><returnValue><value><totalSize>{count * 10}</totalSize><resultSetSize>{count}</resultSetSize>"
+            f"{results}</value></returnValue></response>").encode("utf-8")
+
+
+def find_per_field(content):
+    """
+    The scripts' original fetch_oslc_details loop: two find() calls per field.
+    """
+    root = ET.fromstring(content)
+    result_set_size = int(root.find('.//resultSetSize').text)
+    streams = []
+    for result in root.findall('.//results')[:result_set_size]:
+        item_id = result.find("itemId").text if result.find("itemId") is not None else None
+        name = result.find("name").text if result.find("name") is not None else None
+        if item_id and name:
+            streams.append({"Project_Area_Stream_Name": name, "Project_Area_Stream_OSLC_ID": item_id})
+    return streams, None
+
+
+def best_time(parse, content, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        records, _ = parse(content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the XML parser backends on pagedSearchResult payloads")
+    parser.add_argument("--configurations", metavar="FILE",
+                        help="recorded IConfigurationManagementRestService response (default: synthetic)")
+    parser.add_argument("--test-cases", metavar="FILE",
+                        help="recorded ITestCaseRestService response (default: synthetic)")
+    parser.add_argument("--records", type=int, default=500, help="records per synthetic page")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    payloads = []
+    for label, path, synthetic in (("configurations", args.configurations, synthetic_configurations),
+                                   ("test cases", args.test_cases, synthetic_test_cases)):
+        if path:
+            with open(path, "rb") as payload_file:
+                payloads.append((f"{label} ({path})", payload_file.read()))
+        else:
+            payloads.append((f"{label} (synthetic)", synthetic(args.records)))
+
+    backends = available_backends()
+    if len(backends) == 1:
+        print("lxml is not installed; only the ElementTree backend is measured")
+
+    print(f"{'payload':>32} {'parser':>14} {'KB':>7} {'records':>8} {'ms':>8} {'speedup':>8}")
+    for label, content in payloads:
+        parsers = [(backend.name, backend.parse_page) for backend in backends]
+        if label.startswith("configurations"):
+            parsers.insert(0, ("find per field", find_per_field))
+        baseline = None
+        for name, parse in parsers:
+            elapsed, records = best_time(parse, content, args.repeat)
+            baseline = baseline or elapsed
+            print(f"{label:>32} {name:>14} {len(content) / 1024:>7.0f} {records:>8} {elapsed * 1000:>8.2f} {baseline / elapsed:>7.1f}x")
@@ -7,6 +7,10 @@ import os
 import xml.etree.ElementTree as ET
 import tkinter as tk 
 from tkinter import ttk, messagebox
+from etmCatalog import DEFAULT_PAGE_WORKERS, STREAM_PAGE_SIZE, iter_streams
+from etmClient import create_client
+from etmPageSize import create_page_size_tuner
+from etmCounts import count_query_params, count_request_body, fetch_counts_concurrently, read_json_total_size, read_total_size
 
 # Suppress warnings about unverified HTTPS requests
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -24,13 +28,18 @@ data_governance_TS = config["data_governance_TS"]
 data_governance_TSuite = config["data_governance_TSuite"]
 data_governance_TCER = config["data_governance_TCER"]
 
+# One pooled client (keep-alive connections + JSESSIONID) shared by every ETM call
+etm_client = create_client(config, username, password)
+
+# Page sizes tuned per endpoint from measured throughput, kept per server
+page_size_tuner = create_page_size_tuner(config, etm_client)
+
 
 
  # Assuming max allowed test cases is 100, replace with actual value if needed
 
 # API endpoints
 api_url_project_areas = f"{server_url}/qm/service/com.ibm.team.repository.service.internal.webuiInitializer.IWebUIInitializerRestService/initializationData"
-oslc_api_url_template = f"{server_url}/qm/service/com.ibm.rqm.configmanagement.service.rest.IConfigurationManagementRestService/pagedSearchResult?pageSize=100&page=0&projectArea={{Project_Area_UUID}}"
 api_url = f"{server_url}/qm/service/com.ibm.rqm.planning.common.service.rest.ITestCaseRestService/pagedSearchResult"
 api_url_tcer = f"{server_url}/qm/service/com.ibm.rqm.execution.common.service.rest.ITestcaseExecutionRecordRestService/pagedSearchResult"
 
@@ -53,7 +62,7 @@ def fetch_project_areas():
     """
     try:
         print("Fetching project areas...")
-        response = requests.get(api_url_project_areas, auth=(username, password), verify=False)
+        response = etm_client.get(api_url_project_areas)
         response.raise_for_status()
 
         data = response.json()
@@ -80,26 +89,13 @@ def fetch_oslc_details(project_area_uuid):
         log_message_to_file(f"Error: Project Area UUID is missing.", "Unknown")
         return []
 
-    oslc_url = oslc_api_url_template.replace("{Project_Area_UUID}", project_area_uuid)
     try:
         print(f"Fetching OSLC details for project area {project_area_uuid}...")
-        response = requests.get(oslc_url, auth=(username, password), verify=False)
-        response.raise_for_status()
-
-        root = ET.fromstring(response.text)
-        result_set_size = int(root.find('.//resultSetSize').text)
-        results = root.findall('.//results')
-
-        streams = []
-        for result in results[:result_set_size]:
-            item_id = result.find("itemId").text if result.find("itemId") is not None else None
-            name = result.find("name").text if result.find("name") is not None else None
-            if item_id and name:
-                streams.append({
-                    "Project_Area_Stream_Name": name,
-                    "Project_Area_Stream_OSLC_ID": item_id
-                })
-
+        # Walk every page of the configuration search, not just the first 100 streams
+        streams = [stream.to_dict() for stream in iter_streams(etm_client, project_area_uuid,
+                   config.get("stream_page_size", STREAM_PAGE_SIZE), config.get("page_workers", DEFAULT_PAGE_WORKERS), page_size_tuner)]
+        if page_size_tuner is not None:
+            page_size_tuner.save()
         return streams
     except ET.ParseError as e:
         print(f"Error parsing XML response for Project Area UUID {project_area_uuid}: {e}")
@@ -114,15 +110,14 @@ def fetch_test_plan_count(project_area_uuid, oslc_id):
     """
     Fetches the test plan count for a given project area and OSLC ID.
     """
-    test_plan_api_url = f"{server_url}/qm/service/com.ibm.rqm.planning.common.service.rest.ITestPlanRestService/pagedSearchResult?processArea={project_area_uuid}&page=0&pageSize=500&oslc_config.context={oslc_id}"
+    test_plan_api_url = f"{server_url}/qm/service/com.ibm.rqm.planning.common.service.rest.ITestPlanRestService/pagedSearchResult"
     try:
         print(f"Fetching test plan count for {project_area_uuid} and OSLC ID {oslc_id}...")
-        response = requests.get(test_plan_api_url, auth=(username, password), verify=False)
-        response.raise_for_status()
-
-        root = ET.fromstring(response.text)
-        result_set_size = int(root.find('.//resultSetSize').text)
-        return result_set_size
+        # totalSize is the full result count; resultSetSize is capped at the page size
+        total_size = etm_client.fetch_once("GET", test_plan_api_url, read_total_size, hedge=True, params=count_query_params(project_area_uuid, oslc_id))
+        if total_size is None:
+            print("No <totalSize> element found in the response.")
+        return total_size
     
     except ET.ParseError as e:
         print(f"Error parsing XML response for Test Plan Count: {e}")
@@ -131,7 +126,7 @@ def fetch_test_plan_count(project_area_uuid, oslc_id):
         print(f"Error fetching Test Plan Count: {e}")
         log_message_to_file(f"Error fetching Test Plan Count: {e}")
 
-    return 0
+    return None
 
 
 # Headers
@@ -171,17 +166,9 @@ def fetch_test_case_count(body):
     """
     try:
         # Make the POST request
-        response = requests.post(api_url, data=body, headers=headers, auth=(username, password), verify=False)
-        response.raise_for_status()
-
-        # Parse the XML response
-        root = ET.fromstring(response.text)
-        # body = build_request_body(page=1, page_size=50, process_area=Project_Area_UUID)        
-
-        # Find the <totalSize> element
-        total_size_element = root.find(".//totalSize")
-        if total_size_element is not None:
-            total_size = int(total_size_element.text)
+        # Identical concurrent or repeated queries share one server call
+        total_size = etm_client.fetch_once("POST", api_url, read_total_size, hedge=True, data=body, headers=headers)
+        if total_size is not None:
             print(f"Total Test Case Count: {total_size}")
             return total_size
         else:
@@ -209,25 +196,16 @@ def fetch_test_script_count(project_area_uuid, oslc_id):
     Fetches the test script count for a given project area and OSLC ID.
     """
     test_script_api_url = f"{server_url}/qm/service/com.ibm.rqm.execution.common.service.rest.IExecutionScriptSearchRestService/pagedSearchResult"
-    params = {
-        'oslc_config.context': oslc_id,
-        'pageSize': 500,
-        'processArea': project_area_uuid,
-    }
+    params = count_query_params(project_area_uuid, oslc_id)
     try:
         print(f"Fetching test script count for {project_area_uuid} and OSLC ID {oslc_id}...")
-        response = requests.get(test_script_api_url, params=params, auth=(username, password), verify=False)
-        response.raise_for_status()
-
-        root = ET.fromstring(response.text)
-        total_size_element = root.find(".//totalSize")
-        if total_size_element is not None:
-            total_size = int(total_size_element.text)
+        total_size = etm_client.fetch_once("GET", test_script_api_url, read_total_size, hedge=True, params=params)
+        if total_size is not None:
             print(f"Total Test Script Count: {total_size}")
             return total_size
         else:
             print("No <totalSize> element found in the response.")
-            return 0
+            return None
     except requests.exceptions.RequestException as e:
         print(f"Error fetching Test Script Count: {e}")
         log_message_to_file(f"Error fetching Test Script Count: {e}")
@@ -235,29 +213,18 @@ def fetch_test_script_count(project_area_uuid, oslc_id):
         print(f"Error parsing XML response for Test Script Count: {e}")
         log_message_to_file(f"Error parsing XML response for Test Script Count: {e}")
 
-    return 0
+    return None
 
 def fetch_test_suite_count(project_area_id ,oslc_id):
     try:
 
         api_url_test_suite = f"{server_url}/qm/service/com.ibm.rqm.planning.common.service.rest.ITestSuiteRestService/pagedSearchResult"
         # Set the parameters for the API request
-        params = {
-            'oslc_config.context': oslc_id,
-            'pageSize': 500,
-            'processArea': project_area_id,
-        }
+        params = count_query_params(project_area_id, oslc_id)
         
         # Make the API request
-        response = requests.get(api_url_test_suite, params=params, auth=(username, password), verify=False)
-        response.raise_for_status()  # Raise an error for HTTP issues
-        
-        # Parse the XML response
-        root = ET.fromstring(response.text)
-        total_size_element = root.find(".//totalSize")
-        test_suite_count = int(total_size_element.text) if total_size_element is not None else 0
-        
-        return test_suite_count
+        total_size = etm_client.fetch_once("GET", api_url_test_suite, read_total_size, hedge=True, params=params)
+        return total_size
     except Exception as e:
         print(f"Error fetching test suite count: {e}")
         return None
@@ -293,14 +260,10 @@ def build_request_body_tcer(page=0, page_size=100, process_area="" ,oslc_context
 def fetch_test_case_execution_record_count(body):
 
     try:
-        response = requests.post(api_url_tcer, data=body, headers=headers_tcer, auth=(username, password), verify=False)
-        response.raise_for_status()
-
-        # Parse the JSON response
-        
-        data = response.json()
-        if 'soapenv:Body' in data and "response" in data['soapenv:Body']:
-            return data['soapenv:Body']["response"]["returnValue"]["value"]["totalSize"]
+        # Scan the JSON response incrementally for totalSize
+        total_size = etm_client.fetch_once("POST", api_url_tcer, read_json_total_size, hedge=True, data=body, headers=headers_tcer)
+        if total_size is not None:
+            return total_size
         else:
             print("Invalid response structure.")
             log_message_to_file("Invalid response structure while fetching project areas.")
@@ -312,6 +275,15 @@ def fetch_test_case_execution_record_count(body):
         log_message_to_file(f"Error decoding JSON response: {e}")
 
     return []
+def count_error_message(label, project_area_stream_info):
+    """
+    Dialog text for a count that could not be fetched; never shown as allowed.
+    """
+    return (
+        f"Below are the {label} {project_area_stream_info}"
+        f"Error: the count could not be fetched.\n"
+    )
+
 def on_validate_data_click():
     """
     Handles the logic when the 'Validate Data' button is clicked.
@@ -321,15 +293,23 @@ def on_validate_data_click():
         project_area_uuid = next(area["Project_Area_UUID"] for area in project_areas if area["Project_Area_Name"] == selected_project_area)
         selected_component = component_combobox.get()
         selected_oslc_id = next(comp["Project_Area_Stream_OSLC_ID"] for comp in components if comp["Project_Area_Stream_Name"] == selected_component)
-        body = build_request_body(page=1, page_size=50, process_area=project_area_uuid ,oslc_context=selected_oslc_id)
-        body_tcer = build_request_body_tcer(page=1, page_size=50, process_area=project_area_uuid ,oslc_context=selected_oslc_id)
-        total_size = fetch_test_case_count(body)
-        # Fetch counts
-        test_plan_count = fetch_test_plan_count(project_area_uuid,selected_oslc_id)
-        test_case_count = fetch_test_case_count(body)
-        test_script_count = fetch_test_script_count(project_area_uuid,selected_oslc_id)
-        test_suite_count = fetch_test_suite_count(project_area_uuid,selected_oslc_id)
-        test_case_execution_record_count = fetch_test_case_execution_record_count(body_tcer)
+        body = count_request_body(project_area_uuid, selected_oslc_id)
+        body_tcer = count_request_body(project_area_uuid, selected_oslc_id)
+        # Fetch counts concurrently; a failed query is reported as None without cancelling the others
+        counts, errors = fetch_counts_concurrently({
+            "test_plan": lambda: fetch_test_plan_count(project_area_uuid, selected_oslc_id),
+            "test_case": lambda: fetch_test_case_count(body),
+            "test_script": lambda: fetch_test_script_count(project_area_uuid, selected_oslc_id),
+            "test_suite": lambda: fetch_test_suite_count(project_area_uuid, selected_oslc_id),
+            "test_case_execution_record": lambda: fetch_test_case_execution_record_count(body_tcer),
+        }, max_workers=config.get("count_query_workers", 5))
+        for artifact, error in errors.items():
+            print(f"Error fetching {artifact} count: {error}")
+        test_plan_count = counts["test_plan"]
+        test_case_count = counts["test_case"]
+        test_script_count = counts["test_script"]
+        test_suite_count = counts["test_suite"]
+        test_case_execution_record_count = counts["test_case_execution_record"]
         print(f"Total Count of test plan {test_plan_count}")
         print(f"Total Count of test case {test_case_count}")        
         print(f"Total Count of test script {test_script_count}") 
@@ -343,7 +323,9 @@ def on_validate_data_click():
             f"Stream: {selected_component}\n"
         )
         # Logic for Test Plan
-        if test_plan_count <= data_governance_TP:
+        if test_plan_count is None:
+            test_plan_message = count_error_message("Test Plan", project_area_stream_info)
+        elif test_plan_count <= data_governance_TP:
             remaining_plans = data_governance_TP - test_plan_count
             test_plan_message = (
                 f"Below are the Test Plan {project_area_stream_info}"
@@ -363,7 +345,9 @@ def on_validate_data_click():
             )
 
         # Logic for Test Case
-        if test_case_count <= data_governance_TC:
+        if test_case_count is None:
+            test_case_message = count_error_message("Test Cases", project_area_stream_info)
+        elif test_case_count <= data_governance_TC:
             remaining_cases = data_governance_TC - test_case_count
             test_case_message = (
                 f"Below are the Test Cases {project_area_stream_info}"
@@ -387,7 +371,9 @@ def on_validate_data_click():
             f"Current Test Script Count: {test_script_count}"
         )
         # Logic for Test Script
-        if test_script_count <= data_governance_TS:
+        if test_script_count is None:
+            test_Script_message = count_error_message("Test Script", project_area_stream_info)
+        elif test_script_count <= data_governance_TS:
             remaining_script = data_governance_TS - test_script_count
             test_Script_message = (
                 f"Below are the Test Script {project_area_stream_info}"
@@ -406,7 +392,9 @@ def on_validate_data_click():
                 
             )
        # Logic for Test Suite
-        if test_suite_count <= data_governance_TSuite:
+        if test_suite_count is None:
+            test_Suite_message = count_error_message("Test suite", project_area_stream_info)
+        elif test_suite_count <= data_governance_TSuite:
             remaining_suite = data_governance_TSuite - test_suite_count
             test_Suite_message = (
                 f"Below are the Test suite {project_area_stream_info}"
@@ -425,7 +413,9 @@ def on_validate_data_click():
                 
             )
             # Logic for Test Case Execution Records
-        if test_case_execution_record_count <= data_governance_TCER:
+        if test_case_execution_record_count is None:
+            test_Case_Exec_message = count_error_message("Test Case Execution Records", project_area_stream_info)
+        elif test_case_execution_record_count <= data_governance_TCER:
             remaining_test_case_execution_record = data_governance_TCER- test_case_execution_record_count
             test_Case_Exec_message = (
                 f"Below are the Test Case Execution Records {project_area_stream_info}"
@@ -454,6 +444,7 @@ def on_validate_data_click():
 
         # Log the message to a file
         log_message_to_file(full_message, selected_project_area)
+        print(etm_client.connection_summary())
 
 def on_project_area_select(event):
     """
@@ -7,6 +7,7 @@ import os
 import xml.etree.ElementTree as ET
 import tkinter as tk
 from tkinter import ttk, messagebox
+from etmCatalog import create_stream_cache
 
 # Suppress warnings about unverified HTTPS requests
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -18,6 +19,9 @@ with open("config.json", "r") as config_file:
 username = config["username"]
 password = config["password"]
 server_url = config["server_url"]
+
+# Streams already fetched in this session, keyed by project area UUID
+stream_cache = create_stream_cache(config)
 data_governance_TP = config["data_governance_TP"]
 data_governance_TC = config["data_governance_TC"] # Assuming max allowed test cases is 100, replace with actual value if needed
 
@@ -268,7 +272,7 @@ def on_project_area_select(event):
     if selected_project_area:
         project_area_uuid = next(area["Project_Area_UUID"] for area in project_areas if area["Project_Area_Name"] == selected_project_area)
         global components
-        components = fetch_oslc_details(project_area_uuid)
+        components = stream_cache.get_or_fetch(project_area_uuid, fetch_oslc_details)
 
         # Update the components dropdown
         component_combobox['values'] = [comp["Project_Area_Stream_Name"] for comp in components]
@@ -279,6 +283,16 @@ def on_project_area_select(event):
         # Display the selected project area name
         selected_project_area_label.config(text=f"Selected Project Area: {selected_project_area}")
 
+def on_refresh_streams_click():
+    """
+    Drops the cached streams of the selected project area and fetches them again.
+    """
+    selected_project_area = project_area_combobox.get()
+    if selected_project_area:
+        project_area_uuid = next(area["Project_Area_UUID"] for area in project_areas if area["Project_Area_Name"] == selected_project_area)
+        stream_cache.invalidate(project_area_uuid)
+        on_project_area_select(None)
+
 # Set up Tkinter window
 window = tk.Tk()
 window.title("Project Area and Stream Selector")
@@ -310,6 +324,10 @@ if user_project_areas:
     component_label = tk.Label(window, text="Select Components:")
     component_label.grid(row=2, column=0, padx=10, pady=10)
 
+    # Button to re-fetch the streams of the selected project area
+    refresh_streams_button = tk.Button(window, text="Refresh Streams", command=on_refresh_streams_click)
+    refresh_streams_button.grid(row=2, column=2, padx=10, pady=10)
+
     # Add a button to validate the data
     validate_button = tk.Button(window, text="Validate Data", command=on_validate_data_click)
     validate_button.grid(row=3, column=1, padx=10, pady=10)
@@ -1,4 +1,9 @@
 import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
 import requests
 from openpyxl import Workbook
 import urllib3
@@ -10,6 +15,14 @@ from tkinter import ttk, messagebox
 from cryptography.fernet import Fernet
 from tkinter import simpledialog, messagebox  # Ensure that simpledialog is explicitly imported
 from fpdf import FPDF
+from etmCatalog import DEFAULT_PAGE_WORKERS, DEFAULT_PROJECT_AREA_CACHE_TTL, DEFAULT_PROJECT_AREA_SOURCE, STREAM_PAGE_SIZE, ProjectAreaCache, create_stream_cache, iter_streams, project_area_index, reconcile_project_areas, stream_index
+from etmCatalog import fetch_project_areas as fetch_project_areas_from_source
+from etmClient import create_client
+from etmPageSize import create_page_size_tuner
+from etmPicker import TypeAheadPicker
+from etmCounts import ARTIFACT_LABELS, ARTIFACT_TYPES, count_query_params, count_request_body, fetch_counts_concurrently, read_json_total_size, read_total_size, staleness_limits
+from etmRecords import governance_status
+from etmSnapshot import DEFAULT_SNAPSHOT_PATH, create_snapshot_writer, latest_counts
 
 # Suppress warnings about unverified HTTPS requests (for testing purposes)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -63,19 +76,32 @@ except Exception as e:
     raise
 
 server_url = config["server_url"]
+
+# Streams already fetched in this session, keyed by project area UUID
+stream_cache = create_stream_cache(config)
 data_governance_TP = config["data_governance_TP"]
 data_governance_TC = config["data_governance_TC"] 
 data_governance_TS = config["data_governance_TS"]
 data_governance_TSuite = config["data_governance_TSuite"]
 data_governance_TCER = config["data_governance_TCER"]
+governance_limits = {
+    "test_plan": data_governance_TP,
+    "test_case": data_governance_TC,
+    "test_script": data_governance_TS,
+    "test_suite": data_governance_TSuite,
+    "test_case_execution_record": data_governance_TCER,
+}
+
+# How old a recorded count may be and still be shown while it is refreshed
+count_staleness_limits = staleness_limits(config)
 
 # Function to validate credentials (dummy API for validation in this example)
-def validate_credentials(username, password):
+def validate_credentials(client):
   
     api_url = f"{server_url}/qm" 
     try:
         log_message("Validating credentials")
-        response = requests.get(api_url, auth=(username, password), verify=False)
+        response = client.get(api_url)
         
         if response.status_code == 200:
             log_message("Credentials validated successfully")
@@ -108,8 +134,17 @@ def show_error_and_terminate(message):
 # Main script
 username, password = get_credentials()
 
+# One pooled client (keep-alive connections + JSESSIONID) shared by every ETM call
+etm_client = create_client(config, username, password)
+
+# Page sizes tuned per endpoint from measured throughput, kept per server
+page_size_tuner = create_page_size_tuner(config, etm_client)
+
+# "initializer" (web UI initializationData) or "oslc_catalog" (/qm/oslc_qm/catalog)
+project_area_source = config.get("project_area_source", DEFAULT_PROJECT_AREA_SOURCE)
+
 # Validate credentials
-if not validate_credentials(username, password):
+if not validate_credentials(etm_client):
     show_error_and_terminate("You have entered an Invalid credentials. The session will now terminate.")
 
 # Proceed with the rest of the code if credentials are valid
@@ -119,8 +154,6 @@ print(f"Credentials for {username} validated successfully.")
  # Assuming max allowed test cases is 100, replace with actual value if needed
 
 # API endpoints
-api_url_project_areas = f"{server_url}/qm/service/com.ibm.team.repository.service.internal.webuiInitializer.IWebUIInitializerRestService/initializationData"
-oslc_api_url_template = f"{server_url}/qm/service/com.ibm.rqm.configmanagement.service.rest.IConfigurationManagementRestService/pagedSearchResult?pageSize=100&page=0&projectArea={{Project_Area_UUID}}"
 api_url = f"{server_url}/qm/service/com.ibm.rqm.planning.common.service.rest.ITestCaseRestService/pagedSearchResult"
 api_url_tcer = f"{server_url}/qm/service/com.ibm.rqm.execution.common.service.rest.ITestcaseExecutionRecordRestService/pagedSearchResult"
 
@@ -139,90 +172,84 @@ def log_message_to_file(message, project_area_name):
 
 def fetch_project_areas():
     """
-    Fetches project areas using the API.
+    Fetches project areas from the source set by project_area_source in config.json.
     """
     try:
         print("Fetching project areas...")
         log_message("Fetching project areas...")
-        response = requests.get(api_url_project_areas, auth=(username, password), verify=False)
-        response.raise_for_status()
-
-        data = response.json()
-        if 'soapenv:Body' in data and "response" in data['soapenv:Body']:
-            log_message("Project areas fetched successfully")
-            return data['soapenv:Body']["response"]["returnValue"]["value"]["com.ibm.rqm.planning.service.permissionsWebUIInitializer"]["userProjectAreas"]
-        else:
-            print("Invalid response structure.")
-            log_message("Invalid response structure while fetching project areas.", "ERROR")
-            log_message_to_file("Invalid response structure while fetching project areas.")
+        user_project_areas = fetch_project_areas_from_source(etm_client, project_area_source)
+        log_message("Project areas fetched successfully")
+        return user_project_areas
     except requests.exceptions.RequestException as e:
         print(f"Error fetching project areas: {e}")
         log_message("Error in fetching project areas")
-        log_message_to_file(f"Error fetching project areas: {e}")
+        log_message_to_file(f"Error fetching project areas: {e}", "Unknown")
     except json.JSONDecodeError as e:
         print(f"Error decoding JSON response: {e}")
         log_message("Error decoding JSON response for project area UUID Ids")
-        log_message_to_file(f"Error decoding JSON response: {e}")
+        log_message_to_file(f"Error decoding JSON response: {e}", "Unknown")
+    except ET.ParseError as e:
+        print(f"Error parsing the OSLC catalog: {e}")
+        log_message("Error parsing the OSLC catalog for project areas", "ERROR")
+        log_message_to_file(f"Error parsing the OSLC catalog: {e}", "Unknown")
+    except ValueError as e:
+        print(f"{e}")
+        log_message(f"{e}", "ERROR")
+        log_message_to_file(f"{e}", "Unknown")
 
     return []
 
-def fetch_oslc_details(project_area_uuid):
+def iter_oslc_details(project_area_uuid, failures=None):
     """
-    Fetches OSLC details for a given project area and retrieves all streams.
+    Lazily yields every stream of a project area, walking all result pages.
+
+    A failed page ends the walk; the error is logged and, if given, appended
+    to failures so callers can tell a partial list from a complete one.
     """
     if not project_area_uuid:
         print("Error: Project Area UUID is missing.")
         log_message("Error: Project Area UUID is missing.")
         log_message_to_file(f"Error: Project Area UUID is missing.", "Unknown")
-        return []
+        return
 
-    oslc_url = oslc_api_url_template.replace("{Project_Area_UUID}", project_area_uuid)
     try:
         log_message("Fetching OSLC details for project area")
         print(f"Fetching OSLC details for project area {project_area_uuid}...")
-        response = requests.get(oslc_url, auth=(username, password), verify=False)
-        response.raise_for_status()
-
-        root = ET.fromstring(response.text)
-        result_set_size = int(root.find('.//resultSetSize').text)
-        results = root.findall('.//results')
-
-        streams = []
-        for result in results[:result_set_size]:
-            item_id = result.find("itemId").text if result.find("itemId") is not None else None
-            name = result.find("name").text if result.find("name") is not None else None
-            if item_id and name:
-                streams.append({
-                    "Project_Area_Stream_Name": name,
-                    "Project_Area_Stream_OSLC_ID": item_id
-                })
-
-        return streams
+        for stream in iter_streams(etm_client, project_area_uuid,
+                                   config.get("stream_page_size", STREAM_PAGE_SIZE), config.get("page_workers", DEFAULT_PAGE_WORKERS), page_size_tuner):
+            yield stream.to_dict()
     except ET.ParseError as e:
         log_message("Error parsing XML response for Project Area UUID {project_area_uuid}")
         print(f"Error parsing XML response for Project Area UUID {project_area_uuid}: {e}")
         log_message_to_file(f"Error parsing XML response for Project Area UUID {project_area_uuid}: {e}", project_area_uuid)
+        if failures is not None:
+            failures.append(e)
     except requests.exceptions.RequestException as e:
         log_message("Error fetching OSLC details for Project Area UUID {project_area_uuid}")
         print(f"Error fetching OSLC details for Project Area UUID {project_area_uuid}: {e}")
         log_message_to_file(f"Error fetching OSLC details for Project Area UUID {project_area_uuid}: {e}", project_area_uuid)
+        if failures is not None:
+            failures.append(e)
 
-    return []
+def fetch_oslc_details(project_area_uuid):
+    """
+    Fetches OSLC details for a given project area and retrieves all streams.
+    """
+    return list(iter_oslc_details(project_area_uuid))
 
 def fetch_test_plan_count(project_area_uuid, oslc_id):
     """
     Fetches the test plan count for a given project area and OSLC ID.
     """
-    test_plan_api_url = f"{server_url}/qm/service/com.ibm.rqm.planning.common.service.rest.ITestPlanRestService/pagedSearchResult?processArea={project_area_uuid}&page=0&pageSize=500&oslc_config.context={oslc_id}"
+    test_plan_api_url = f"{server_url}/qm/service/com.ibm.rqm.planning.common.service.rest.ITestPlanRestService/pagedSearchResult"
     try:
         log_message(f"Fetching test plan count.....")
         print(f"Fetching test plan count for {project_area_uuid} and OSLC ID {oslc_id}...")
-        response = requests.get(test_plan_api_url, auth=(username, password), verify=False)
-        response.raise_for_status()
-
-        root = ET.fromstring(response.text)
-        result_set_size = int(root.find('.//resultSetSize').text)
-        return result_set_size
+        # totalSize is the full result count; resultSetSize is capped at the page size
+        total_size = etm_client.fetch_once("GET", test_plan_api_url, read_total_size, hedge=True, params=count_query_params(project_area_uuid, oslc_id))
+        if total_size is None:
+            print("No <totalSize> element found in the response.")
+        return total_size
     
     except ET.ParseError as e:
         log_message(f"Error parsing XML response for Test Plan Count: {e}")
@@ -233,7 +260,8 @@ def fetch_test_plan_count(project_area_uuid, oslc_id):
         print(f"Error fetching Test Plan Count: {e}")
         log_message_to_file(f"Error fetching Test Plan Count: {e}")
 
-    return 0
+    # None is reported as a failed count and never recorded
+    return None
 
 
 # Headers
@@ -273,18 +301,10 @@ def fetch_test_case_count(body):
     """
     try:
         # Make the POST request
-        response = requests.post(api_url, data=body, headers=headers, auth=(username, password), verify=False)
-        response.raise_for_status()
-
-        # Parse the XML response
-        root = ET.fromstring(response.text)
-        # body = build_request_body(page=1, page_size=50, process_area=Project_Area_UUID)        
-
-        # Find the <totalSize> element
-        total_size_element = root.find(".//totalSize")
-        if total_size_element is not None:
+        # Identical concurrent or repeated queries share one server call
+        total_size = etm_client.fetch_once("POST", api_url, read_total_size, hedge=True, data=body, headers=headers)
+        if total_size is not None:
             log_message(f"Fetching test case count.....")
-            total_size = int(total_size_element.text)
             print(f"Total Test Case Count: {total_size}")
             return total_size
         else:
@@ -312,26 +332,17 @@ def fetch_test_script_count(project_area_uuid, oslc_id):
     Fetches the test script count for a given project area and OSLC ID.
     """
     test_script_api_url = f"{server_url}/qm/service/com.ibm.rqm.execution.common.service.rest.IExecutionScriptSearchRestService/pagedSearchResult"
-    params = {
-        'oslc_config.context': oslc_id,
-        'pageSize': 500,
-        'processArea': project_area_uuid,
-    }
+    params = count_query_params(project_area_uuid, oslc_id)
     try:
         
-        response = requests.get(test_script_api_url, params=params, auth=(username, password), verify=False)
-        response.raise_for_status()
-
-        root = ET.fromstring(response.text)
-        total_size_element = root.find(".//totalSize")
-        if total_size_element is not None:
-            total_size = int(total_size_element.text)
+        total_size = etm_client.fetch_once("GET", test_script_api_url, read_total_size, hedge=True, params=params)
+        if total_size is not None:
             log_message(f"Fetching test script count.....")
             # print(f"Total Test Script Count: {total_size}")
             return total_size
         else:
             print("No <totalSize> element found in the response.")
-            return 0
+            return None
     except requests.exceptions.RequestException as e:
         log_message(f"Error fetching Test Script Count: {e}")
         print(f"Error fetching Test Script Count: {e}")
@@ -341,29 +352,19 @@ def fetch_test_script_count(project_area_uuid, oslc_id):
         print(f"Error parsing XML response for Test Script Count: {e}")
         log_message_to_file(f"Error parsing XML response for Test Script Count: {e}")
 
-    return 0
+    return None
 
 def fetch_test_suite_count(project_area_id ,oslc_id):
     try:
 
         api_url_test_suite = f"{server_url}/qm/service/com.ibm.rqm.planning.common.service.rest.ITestSuiteRestService/pagedSearchResult"
         # Set the parameters for the API request
-        params = {
-            'oslc_config.context': oslc_id,
-            'pageSize': 500,
-            'processArea': project_area_id,
-        }
+        params = count_query_params(project_area_id, oslc_id)
         
         # Make the API request
-        response = requests.get(api_url_test_suite, params=params, auth=(username, password), verify=False)
-        response.raise_for_status()  # Raise an error for HTTP issues
-        
-        # Parse the XML response
-        root = ET.fromstring(response.text)
-        total_size_element = root.find(".//totalSize")
-        test_suite_count = int(total_size_element.text) if total_size_element is not None else 0
+        total_size = etm_client.fetch_once("GET", api_url_test_suite, read_total_size, hedge=True, params=params)
         log_message(f"Fetching test suite count.....")
-        return test_suite_count
+        return total_size
     except Exception as e:
         log_message(f"Error fetching test suite count: {e}")
         print(f"Error fetching test suite count: {e}")
@@ -400,15 +401,11 @@ def build_request_body_tcer(page=0, page_size=100, process_area="" ,oslc_context
 def fetch_test_case_execution_record_count(body):
 
     try:
-        response = requests.post(api_url_tcer, data=body, headers=headers_tcer, auth=(username, password), verify=False)
-        response.raise_for_status()
-
-        # Parse the JSON response
-        
-        data = response.json()
-        if 'soapenv:Body' in data and "response" in data['soapenv:Body']:
+        # Scan the JSON response incrementally for totalSize
+        total_size = etm_client.fetch_once("POST", api_url_tcer, read_json_total_size, hedge=True, data=body, headers=headers_tcer)
+        if total_size is not None:
             log_message(f"Fetching test case execution record count.....")
-            return data['soapenv:Body']["response"]["returnValue"]["value"]["totalSize"]
+            return total_size
         else:
             log_message("Invalid response structure for Tase case execution record.")
             print("Invalid response structure.")
@@ -422,7 +419,7 @@ def fetch_test_case_execution_record_count(body):
         print(f"Error decoding JSON response: {e}")
         log_message_to_file(f"Error decoding JSON response: {e}")
 
-    return []
+    return None
 
 # Function to log messages to a file
 def log_message_to_file(message, project_area_name):
@@ -445,8 +442,15 @@ def generate_project_report(
     test_suite_count,
     data_governance_TSuite,
     test_case_execution_record_count,
-    data_governance_TCER
+    data_governance_TCER,
+    counts_recorded_at=None
 ):
+    """
+    Writes the summary PDF. counts_recorded_at maps each artifact whose count
+    was taken from a recording (rather than fetched just now) to the time it
+    was recorded; that time and its age are printed in the artifact's section.
+    """
+    counts_recorded_at = counts_recorded_at or {}
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
@@ -481,7 +485,10 @@ def generate_project_report(
     pdf.ln(5)
 
     # Helper function to add a section
-    def add_section(title, details,is_success):
+    def add_section(title, details,is_success, artifact):
+        if artifact in counts_recorded_at:
+            recorded = counts_recorded_at[artifact]
+            details = details + [("Count Recorded", f"{datetime.fromtimestamp(recorded).strftime('%Y-%m-%d %H:%M')} ({format_age(time.time() - recorded)})")]
         if is_success:
             pdf.set_text_color(0, 128, 0)  # Green
         else:
@@ -495,8 +502,20 @@ def generate_project_report(
             pdf.cell(0, 10, value, border=1, ln=True)
         pdf.ln(5)
 
+    # A count that could not be fetched is reported as an error, never as allowed
+    def add_error_section(title, count_label, limit_label, limit, artifact):
+        details = [
+            ("Permission Status", "Error: count could not be fetched"),
+            (count_label, "Error"),
+            (limit_label, str(limit)),
+        ]
+        log_message(f"Fetching the {details}")
+        add_section(title, details, False, artifact)
+
     # Test Plan Details
-    if test_plan_count <= data_governance_TP:
+    if test_plan_count is None:
+        add_error_section("Test Plan Details", "Current Test Plan Count", "Maximum Test Plans Allowed", data_governance_TP, "test_plan")
+    elif test_plan_count <= data_governance_TP:
         remaining_plans = data_governance_TP - test_plan_count
         test_plan_details = [
             ("Permission Status", "Allowed to create test plans"),
@@ -505,7 +524,7 @@ def generate_project_report(
             ("Remaining Test Plans", str(remaining_plans)),
         ]
         log_message(f"Fetching the {test_plan_details}")
-        add_section("Test Plan Details", test_plan_details,True)
+        add_section("Test Plan Details", test_plan_details,True, "test_plan")
     else:
         exceeded_plans = test_plan_count - data_governance_TP
         test_plan_details = [
@@ -515,11 +534,13 @@ def generate_project_report(
             ("Exceeded Test Plan Value", str(exceeded_plans)),
         ]
         log_message(f"Fetching the {test_plan_details}")
-        add_section("Test Plan Details", test_plan_details,False)
+        add_section("Test Plan Details", test_plan_details,False, "test_plan")
     
 
     # Test Case Details
-    if test_case_count <= data_governance_TC:
+    if test_case_count is None:
+        add_error_section("Test Case Details", "Current Test Case Count", "Maximum Test Cases Allowed", data_governance_TC, "test_case")
+    elif test_case_count <= data_governance_TC:
         remaining_cases = data_governance_TC - test_case_count
         test_case_details = [
             ("Permission Status", "Allowed to create test cases"),
@@ -527,7 +548,7 @@ def generate_project_report(
             ("Maximum Test Cases Allowed", str(data_governance_TC)),
             ("Remaining Test Cases", str(remaining_cases)),
         ]
-        add_section("Test Case Details", test_case_details,True)
+        add_section("Test Case Details", test_case_details,True, "test_case")
         log_message(f"Fetching the {test_case_details}")
     else:
         exceeded_cases = test_case_count - data_governance_TC
@@ -537,12 +558,14 @@ def generate_project_report(
             ("Current Test Case Count", str(test_case_count)),
             ("Exceeded Test Case Value", str(exceeded_cases)),
         ]
-        add_section("Test Case Details", test_case_details,False)
+        add_section("Test Case Details", test_case_details,False, "test_case")
         log_message(f"Fetching the {test_case_details}")
     
 
     # Test Script Details
-    if test_script_count <= data_governance_TS:
+    if test_script_count is None:
+        add_error_section("Test Script Details", "Current Test Script Count", "Maximum Test Scripts Allowed", data_governance_TS, "test_script")
+    elif test_script_count <= data_governance_TS:
         remaining_scripts = data_governance_TS - test_script_count
         test_script_details = [
             ("Permission Status", "Allowed to create test scripts"),
@@ -550,7 +573,7 @@ def generate_project_report(
             ("Maximum Test Scripts Allowed", str(data_governance_TS)),
             ("Remaining Test Scripts", str(remaining_scripts)),
         ]
-        add_section("Test Script Details", test_script_details,True)
+        add_section("Test Script Details", test_script_details,True, "test_script")
         log_message(f"Fetching the {test_script_details}")
     else:
         exceeded_scripts = test_script_count - data_governance_TS
@@ -560,12 +583,14 @@ def generate_project_report(
             ("Current Test Script Count", str(test_script_count)),
             ("Exceeded Test Script Value", str(exceeded_scripts)),
         ]
-        add_section("Test Script Details", test_script_details,False)
+        add_section("Test Script Details", test_script_details,False, "test_script")
         log_message(f"Fetching the {test_script_details}")
     
 
     # Test Suite Details
-    if test_suite_count <= data_governance_TSuite:
+    if test_suite_count is None:
+        add_error_section("Test Suite Details", "Current Test Suite Count", "Maximum Test Suites Allowed", data_governance_TSuite, "test_suite")
+    elif test_suite_count <= data_governance_TSuite:
         remaining_suites = data_governance_TSuite - test_suite_count
         test_suite_details = [
             ("Permission Status", "Allowed to create test suites"),
@@ -573,7 +598,7 @@ def generate_project_report(
             ("Maximum Test Suites Allowed", str(data_governance_TSuite)),
             ("Remaining Test Suites", str(remaining_suites)),
         ]
-        add_section("Test Suite Details", test_suite_details,True)
+        add_section("Test Suite Details", test_suite_details,True, "test_suite")
         log_message(f"Fetching the {test_suite_details}")
     else:
         exceeded_suites = test_suite_count - data_governance_TSuite
@@ -584,11 +609,13 @@ def generate_project_report(
             ("Exceeded Test Suite Value", str(exceeded_suites)),
         ]
         log_message(f"Fetching the {test_suite_details}")
-        add_section("Test Suite Details", test_suite_details,False)
+        add_section("Test Suite Details", test_suite_details,False, "test_suite")
     
 
     # Test Case Execution Record Details
-    if test_case_execution_record_count <= data_governance_TCER:
+    if test_case_execution_record_count is None:
+        add_error_section("Test Case Execution Record Details", "Current Test Case Execution Record Count", "Maximum Test Case Execution Records Allowed", data_governance_TCER, "test_case_execution_record")
+    elif test_case_execution_record_count <= data_governance_TCER:
         remaining_records = data_governance_TCER - test_case_execution_record_count
         test_case_execution_details = [
             ("Permission Status", "Allowed to create test case execution records"),
@@ -596,7 +623,7 @@ def generate_project_report(
             ("Maximum Test Case Execution Records Allowed", str(data_governance_TCER)),
             ("Remaining Test Case Execution Records", str(remaining_records)),
         ]
-        add_section("Test Case Execution Record Details", test_case_execution_details,True)
+        add_section("Test Case Execution Record Details", test_case_execution_details,True, "test_case_execution_record")
         log_message(f"Fetching the {test_case_execution_details}")
     else:
         exceeded_records = test_case_execution_record_count - data_governance_TCER
@@ -606,7 +633,7 @@ def generate_project_report(
             ("Current Test Case Execution Record Count", str(test_case_execution_record_count)),
             ("Exceeded Test Case Execution Record Value", str(exceeded_records)),
         ]
-        add_section("Test Case Execution Record Details", test_case_execution_details,False)
+        add_section("Test Case Execution Record Details", test_case_execution_details,False, "test_case_execution_record")
         log_message(f"Fetching the {test_case_execution_details}")
     
 
@@ -614,7 +641,6 @@ def generate_project_report(
     # full_message = f"{test_plan_details}\n\n{test_case_details}\n\n{test_script_details}\n\n{test_suite_details}\n\n{test_case_execution_details}"
 
     window.update()
-    update_status("Completed")  # Update status to Completed
 
     # Display the message in a popup
     # messagebox.showinfo("Test Plan and Test Case Validation", full_message)
@@ -627,103 +653,493 @@ def generate_project_report(
     print(f"Report generated: {pdf_output_filename}")
 
 
-# def update_status(status):
-#     """Update the status label with the given status."""
-#     # status_label.config(text=f"Status: {In-Progress}")
-#     status_label.config(text="Status: In Progress...", fg="green",font=("Helvetica", 12, "bold"))  # Update status to in progress
 def update_status(status):
     """Update the status label with the given status."""
     if status == "In Progress":
         status_label.config(text="Status: In Progress...", fg="orange", font=("Helvetica", 12, "bold"))
     elif status == "Completed":
         status_label.config(text="Status: Completed", fg="green", font=("Helvetica", 12, "bold"))
+    elif status == "Cancelled":
+        status_label.config(text="Status: Cancelled", fg="red", font=("Helvetica", 12, "bold"))
     else:
         status_label.config(text="Status: Unknown", fg="red", font=("Helvetica", 12, "bold"))
 
+# Messages (kind, payload) sent from the validation worker to the Tk thread
+ui_queue = queue.Queue()
+
+# Recorded counts currently shown in the progress rows while they are refreshed
+recorded_counts_shown = {}
+
+# True while a validation worker is running; only one runs at a time
+validation_running = False
+
+# Stream selected while a validation was running, refreshed once it ends
+pending_selection = None
+
+# CancelToken of the running validation; Cancel aborts only the calls joined to it
+validation_token = None
+
+def format_age(seconds):
+    """Short age label for a recorded count."""
+    if seconds < 60:
+        return "just now"
+    if seconds < 60 * 60:
+        return f"{int(seconds // 60)} min ago"
+    if seconds < 24 * 60 * 60:
+        return f"{int(seconds // 3600)} h ago"
+    return f"{int(seconds // 86400)} d ago"
+
+def recent_counts(project_area_uuid, oslc_id):
+    """
+    The last recorded counts of a stream that are within their artifact's
+    staleness limit, as {artifact: ArtifactCount}.
+    """
+    try:
+        recorded = latest_counts(config.get("snapshot_db", DEFAULT_SNAPSHOT_PATH), server_url, project_area_uuid, oslc_id)
+    except sqlite3.Error as e:
+        log_message(f"Error reading recorded counts: {e}", "ERROR")
+        return {}
+    now = time.time()
+    return {artifact: record for artifact, record in recorded.items() if now - record.fetched_at <= count_staleness_limits[artifact]}
+
+def show_count(artifact, count, age_text=""):
+    """Shows a count in its progress row, green when allowed and red when not."""
+    status = governance_status(count, governance_limits[artifact])
+    progress_values[artifact].config(text=str(count), fg="green" if status == "Allowed" else "red")
+    progress_ages[artifact].config(text=age_text, fg="gray")
+
+def reset_progress(recorded=None):
+    """
+    Put every artifact progress row back into its waiting state, showing the
+    recorded counts given (stale-while-revalidate) with their age.
+    """
+    recorded_counts_shown.clear()
+    recorded_counts_shown.update(recorded or {})
+    now = time.time()
+    for artifact in ARTIFACT_TYPES:
+        progress_bars[artifact].config(mode="indeterminate", value=0)
+        progress_bars[artifact].start(10)
+        if artifact in recorded_counts_shown:
+            record = recorded_counts_shown[artifact]
+            show_count(artifact, record.count, format_age(now - record.fetched_at))
+        else:
+            progress_values[artifact].config(text="...", fg="black")
+            progress_ages[artifact].config(text="", fg="gray")
+
+def clear_progress():
+    """Empty every artifact progress row."""
+    recorded_counts_shown.clear()
+    for artifact in ARTIFACT_TYPES:
+        progress_bars[artifact].stop()
+        progress_bars[artifact].config(mode="determinate", value=0)
+        progress_values[artifact].config(text="", fg="black")
+        progress_ages[artifact].config(text="", fg="gray")
+
+def show_count_progress(artifact, count, error):
+    """Fill the progress row of an artifact once its count has arrived."""
+    progress_bars[artifact].stop()
+    progress_bars[artifact].config(mode="determinate", maximum=1, value=1)
+    if error is None:
+        recorded_counts_shown.pop(artifact, None)
+        show_count(artifact, count)
+    elif artifact in recorded_counts_shown:
+        # Keep showing the recorded count; it is still within its staleness limit
+        record = recorded_counts_shown[artifact]
+        progress_ages[artifact].config(text=f"{format_age(time.time() - record.fetched_at)}, refresh failed", fg="red")
+    else:
+        progress_values[artifact].config(text="Error", fg="red")
+        progress_ages[artifact].config(text="")
+
+def run_validation(selected_project_area, selected_component, project_area_uuid, selected_oslc_id, generate_report=True, cancel_token=None):
+    """
+    Worker thread: fetches the counts and reports each one back through ui_queue.
+    """
+    try:
+        body = count_request_body(project_area_uuid, selected_oslc_id)
+        body_tcer = count_request_body(project_area_uuid, selected_oslc_id)
+        # Fetch counts concurrently; a failed query is reported as None without cancelling the others
+        fetchers = {
+            "test_plan": lambda: fetch_test_plan_count(project_area_uuid, selected_oslc_id),
+            "test_case": lambda: fetch_test_case_count(body),
+            "test_script": lambda: fetch_test_script_count(project_area_uuid, selected_oslc_id),
+            "test_suite": lambda: fetch_test_suite_count(project_area_uuid, selected_oslc_id),
+            "test_case_execution_record": lambda: fetch_test_case_execution_record_count(body_tcer),
+        }
+        if cancel_token is not None:
+            # The pool threads join the run's token so Cancel aborts only their calls
+            fetchers = {artifact: cancel_token.bind(fetcher) for artifact, fetcher in fetchers.items()}
+        counts, errors = fetch_counts_concurrently(fetchers, max_workers=config.get("count_query_workers", 5),
+            on_result=lambda artifact, count, error: ui_queue.put(("count", (artifact, count, error))))
+        if cancel_token is not None and cancel_token.cancelled():
+            ui_queue.put(("cancelled", None))
+        else:
+            ui_queue.put(("done", (selected_project_area, selected_component, project_area_uuid, selected_oslc_id, counts, errors, generate_report)))
+    except Exception as e:
+        ui_queue.put(("error", e))
+
+def poll_ui_queue():
+    """
+    Applies worker messages on the Tk thread; reschedules itself until the run ends.
+    """
+    global validation_running, pending_selection
+    while True:
+        try:
+            kind, payload = ui_queue.get_nowait()
+        except queue.Empty:
+            window.after(100, poll_ui_queue)
+            return
+
+        if kind == "count":
+            show_count_progress(*payload)
+            continue
+
+        validation_running = False
+        validate_button.config(state="normal")
+        cancel_button.config(state="disabled")
+        if kind == "done":
+            finish_validation(*payload)
+        elif kind == "cancelled":
+            for artifact in ARTIFACT_TYPES:
+                progress_bars[artifact].stop()
+            update_status("Cancelled")
+            log_message("Validation cancelled")
+        else:
+            update_status("Unknown")
+            log_message(f"Validation failed: {payload}", "ERROR")
+            messagebox.showerror("Error", f"Validation failed: {payload}")
+
+        # Refresh a stream selected during the run, if it is still the selection;
+        # otherwise the rows would show the finished run's counts under it
+        pending, pending_selection = pending_selection, None
+        if pending is not None:
+            if selected_stream() == pending:
+                start_validation(*pending, generate_report=False)
+            else:
+                clear_progress()
+        return
+
+def record_snapshot(project_area_uuid, selected_project_area, selected_oslc_id, selected_component, counts, errors):
+    """
+    Stores the successfully fetched counts in the snapshot store.
+    """
+    try:
+        with create_snapshot_writer(config, "report") as snapshot:
+            snapshot.add_project_area(project_area_uuid, selected_project_area)
+            snapshot.add_stream(project_area_uuid, selected_oslc_id, selected_component)
+            for artifact, count in counts.items():
+                if artifact not in errors:
+                    snapshot.add_count(project_area_uuid, selected_oslc_id, artifact, count)
+    except sqlite3.Error as e:
+        log_message(f"Error writing snapshot: {e}", "ERROR")
+
+def finish_validation(selected_project_area, selected_component, project_area_uuid, selected_oslc_id, counts, errors, generate_report=True):
+    """
+    Logs the fetched counts, records them and generates the report on the Tk thread.
+    A count that failed to refresh is taken from the recorded one still shown.
+    """
+    for artifact, error in errors.items():
+        log_message(f"Error fetching {artifact} count: {error}", "ERROR")
+    record_snapshot(project_area_uuid, selected_project_area, selected_oslc_id, selected_component, counts, errors)
+    counts = dict(counts)
+    counts_recorded_at = {}
+    for artifact in errors:
+        if artifact in recorded_counts_shown:
+            counts[artifact] = recorded_counts_shown[artifact].count
+            counts_recorded_at[artifact] = recorded_counts_shown[artifact].fetched_at
+            log_message(f"Using the count of {artifact} recorded {format_age(time.time() - recorded_counts_shown[artifact].fetched_at)}")
+
+    if not generate_report:
+        update_status("Completed")
+        log_message(etm_client.connection_summary())
+        return
+    test_plan_count = counts["test_plan"]
+    test_case_count = counts["test_case"]
+    test_script_count = counts["test_script"]
+    test_suite_count = counts["test_suite"]
+    test_case_execution_record_count = counts["test_case_execution_record"]
+    print(f"Total Count of test plan {test_plan_count}")
+    log_message(f"Total Count of test plan {test_plan_count}")
+    print(f"Total Count of test case {test_case_count}")  
+    log_message(f"Total Count of test case {test_case_count}")      
+    print(f"Total Count of test script {test_script_count}") 
+    log_message(f"Total Count of test script {test_script_count}") 
+    print(f"Total Count of test suite {test_suite_count}") 
+    log_message(f"Total Count of test suite {test_suite_count}") 
+    print(f"Total Count of test case execution record {test_case_execution_record_count}") 
+    log_message(f"Total Count of test case execution record {test_case_execution_record_count}")
+
+    # Generate the report PDF
+    generate_project_report(selected_project_area, selected_component, test_plan_count, data_governance_TP, test_case_count, data_governance_TC,
+                            test_script_count, data_governance_TS, test_suite_count, data_governance_TSuite, test_case_execution_record_count, data_governance_TCER,
+                            counts_recorded_at=counts_recorded_at)
+
+    update_status("Completed")  # Update status to Completed
+    log_message(etm_client.connection_summary())
+
+    messagebox.showinfo("Execution Completed", "Script execution has been completed.")
+
+def start_validation(selected_project_area, selected_component, project_area_uuid, selected_oslc_id, generate_report):
+    """
+    Shows the recorded counts of the stream at once and refreshes them on a
+    worker thread; progress comes back through ui_queue. When every count
+    has a recent recording, the report is written from those first and
+    written again once the fresh counts are in.
+    """
+    global validation_running, validation_token
+    validation_running = True
+    recorded = recent_counts(project_area_uuid, selected_oslc_id)
+    update_status("In Progress")  # Set status to In-Progress
+    reset_progress(recorded)
+    validate_button.config(state="disabled")
+    cancel_button.config(state="normal")
+    validation_token = etm_client.cancel_token()
+
+    if generate_report and len(recorded) == len(ARTIFACT_TYPES):
+        generate_project_report(selected_project_area, selected_component,
+                                recorded["test_plan"].count, data_governance_TP, recorded["test_case"].count, data_governance_TC,
+                                recorded["test_script"].count, data_governance_TS, recorded["test_suite"].count, data_governance_TSuite,
+                                recorded["test_case_execution_record"].count, data_governance_TCER,
+                                counts_recorded_at={artifact: record.fetched_at for artifact, record in recorded.items()})
+
+    threading.Thread(
+        target=run_validation,
+        args=(selected_project_area, selected_component, project_area_uuid, selected_oslc_id, generate_report, validation_token),
+        daemon=True,
+    ).start()
+    window.after(100, poll_ui_queue)
+
+def selected_stream():
+    """
+    Returns (project area name, stream name, project area UUID, OSLC id) of the
+    current selection, or None if a project area or stream is not selected.
+    """
+    area = project_area_picker.selected()
+    stream = component_picker.selected()
+    if area is None or stream is None:
+        return None
+    return area["Project_Area_Name"], stream["Project_Area_Stream_Name"], area["Project_Area_UUID"], stream["Project_Area_Stream_OSLC_ID"]
+
 def on_validate_data_click():
     """
     Handles the logic when the 'Validate Data' button is clicked.
+
+    The network calls run on a worker thread so the window stays responsive.
     """
+    selection = selected_stream()
+    if selection and not validation_running:
+        start_validation(*selection, generate_report=True)
 
-    """Handles the logic when the 'Validate Data' button is clicked."""
-    update_status("In Progress")  # Set status to In-Progress
-    window.update()  # Update the window to reflect the change
-
-    # status_label.config(text="Status: In Progress...", fg="orange")  # Update status to in progress
-    # window.update()  # Update the window to reflect the change
-
-    selected_project_area = project_area_combobox.get()
-    if selected_project_area:
-        project_area_uuid = next(area["Project_Area_UUID"] for area in project_areas if area["Project_Area_Name"] == selected_project_area)
-        selected_component = component_combobox.get()
-        selected_oslc_id = next(comp["Project_Area_Stream_OSLC_ID"] for comp in components if comp["Project_Area_Stream_Name"] == selected_component)
-        body = build_request_body(page=1, page_size=50, process_area=project_area_uuid ,oslc_context=selected_oslc_id)
-        body_tcer = build_request_body_tcer(page=1, page_size=50, process_area=project_area_uuid ,oslc_context=selected_oslc_id)
-        total_size = fetch_test_case_count(body)
-        # Fetch counts
-        test_plan_count = fetch_test_plan_count(project_area_uuid,selected_oslc_id)
-        test_case_count = fetch_test_case_count(body)
-        test_script_count = fetch_test_script_count(project_area_uuid,selected_oslc_id)
-        test_suite_count = fetch_test_suite_count(project_area_uuid,selected_oslc_id)
-        test_case_execution_record_count = fetch_test_case_execution_record_count(body_tcer)
-        print(f"Total Count of test plan {test_plan_count}")
-        log_message(f"Total Count of test plan {test_plan_count}")
-        print(f"Total Count of test case {test_case_count}")  
-        log_message(f"Total Count of test case {test_case_count}")      
-        print(f"Total Count of test script {test_script_count}") 
-        log_message(f"Total Count of test script {test_script_count}") 
-        print(f"Total Count of test suite {test_suite_count}") 
-        log_message(f"Total Count of test suite {test_suite_count}") 
-        print(f"Total Count of test case execution record {test_case_execution_record_count}") 
-        log_message(f"Total Count of test case execution record {test_case_execution_record_count}")
-
-                
-        # Generate the report PDF
-        generate_project_report(selected_project_area, selected_component, test_plan_count, data_governance_TP, test_case_count, data_governance_TC,
-                                test_script_count, data_governance_TS, test_suite_count, data_governance_TSuite, test_case_execution_record_count, data_governance_TCER)
-        
+def on_component_select(event):
+    """
+    Shows the recorded counts of the selected stream and refreshes them in
+    the background, without writing a report. A stream selected while a
+    validation is running is refreshed once that run ends.
+    """
+    global pending_selection
+    selection = selected_stream()
+    if selection and validation_running:
+        pending_selection = selection
+        log_message(f"{selection[1]} will be refreshed when the running validation ends")
+    elif selection:
+        start_validation(*selection, generate_report=False)
+
+def on_snapshot_report_click():
+    """
+    Generates the report from the latest recorded counts without querying ETM.
+    """
+    selection = selected_stream()
+    if selection is None:
+        messagebox.showwarning("Snapshot Report", "Select a project area and a component first.")
+        return
+    selected_project_area, selected_component, project_area_uuid, selected_oslc_id = selection
+
+    counts = latest_counts(config.get("snapshot_db", DEFAULT_SNAPSHOT_PATH), server_url, project_area_uuid, selected_oslc_id)
+    missing = [ARTIFACT_LABELS[artifact] for artifact in ARTIFACT_TYPES if artifact not in counts]
+    if missing:
+        messagebox.showwarning("Snapshot Report", f"No recorded counts for: {', '.join(missing)}. Run Validate Data first.")
+        return
+
+    oldest = min(record.fetched_at for record in counts.values())
+    log_message(f"Generating report from snapshot recorded {datetime.fromtimestamp(oldest).strftime('%Y-%m-%d %H:%M:%S')}")
+    generate_project_report(selected_project_area, selected_component,
+                            counts["test_plan"].count, data_governance_TP, counts["test_case"].count, data_governance_TC,
+                            counts["test_script"].count, data_governance_TS, counts["test_suite"].count, data_governance_TSuite,
+                            counts["test_case_execution_record"].count, data_governance_TCER,
+                            counts_recorded_at={artifact: record.fetched_at for artifact, record in counts.items()})
+    messagebox.showinfo("Snapshot Report", "Report generated from the latest snapshot.")
+
+def on_cancel_click():
+    """
+    Aborts the running validation, including its requests already in flight.
+    Stream loading and other calls on the shared client keep running.
+    """
+    cancel_button.config(state="disabled")
+    log_message("Cancelling validation...")
+    if validation_token is not None:
+        validation_token.cancel()
 
-        update_status("Completed")  # Update status to Completed
-        window.update()  # Update window to reflect status change
+# Streams of the selected project area, pushed by the loader thread as pages arrive
+stream_queue = queue.Queue()
+loading_project_area_uuid = None
+stream_poll_active = False
 
-        messagebox.showinfo("Execution Completed", "Script execution has been completed.")
-        
-        
-        
+def load_streams_worker(project_area_uuid):
+    """
+    Worker thread: streams the project area's configurations into stream_queue.
+    Ends with "done" and the full list, or "failed" and the error if a page
+    could not be fetched.
+    """
+    streams = []
+    failures = []
+    for stream in iter_oslc_details(project_area_uuid, failures):
+        streams.append(stream)
+        stream_queue.put(("stream", project_area_uuid, stream))
+    if failures:
+        stream_queue.put(("failed", project_area_uuid, failures[0]))
+    else:
+        stream_queue.put(("done", project_area_uuid, streams))
+
+def poll_stream_queue():
+    """
+    Adds the streams received so far to the components dropdown. Only a
+    complete list is cached; an interrupted one is shown as incomplete.
+    """
+    global loading_project_area_uuid, stream_poll_active
+    finished = False
+    added = False
+    failure = None
+    while True:
+        try:
+            kind, project_area_uuid, payload = stream_queue.get_nowait()
+        except queue.Empty:
+            break
+        if project_area_uuid != loading_project_area_uuid:
+            continue  # A different project area has been selected since
+        if kind == "stream":
+            component_index.add(payload)
+            added = True
+        elif kind == "failed":
+            failure = payload
+            finished = True
+        else:
+            stream_cache.put(project_area_uuid, payload)
+            finished = True
+
+    if added:
+        component_picker.refresh()
+    if finished:
+        loading_project_area_uuid = None
+        if failure is None:
+            log_message(f"Loaded {len(component_index)} streams")
+        else:
+            log_message(f"Stream list incomplete: loaded {len(component_index)} streams before an error: {failure}", "ERROR")
+            selected_project_area_label.config(text=f"{selected_project_area_label.cget('text')} (stream list incomplete)")
+            messagebox.showwarning("Streams", f"Only {len(component_index)} streams could be loaded: {failure}\n"
+                                              "Click Refresh Streams to try again.")
+        if page_size_tuner is not None:
+            page_size_tuner.save()
+    stream_poll_active = loading_project_area_uuid is not None
+    if stream_poll_active:
+        window.after(100, poll_stream_queue)
 
 def on_project_area_select(event):
     """
     Fetch and update components based on selected project area.
-    """
-    selected_project_area = project_area_combobox.get()
-    if selected_project_area:
-        project_area_uuid = next(area["Project_Area_UUID"] for area in project_areas if area["Project_Area_Name"] == selected_project_area)
-        global components
-        components = fetch_oslc_details(project_area_uuid)
 
-        # Update the components dropdown
-        component_combobox['values'] = [comp["Project_Area_Stream_Name"] for comp in components]
-        component_combobox.set('')  # Clear previous selection
-        component_combobox.grid(row=2, column=1, padx=10, pady=10)
-        component_combobox.bind("<<ComboboxSelected>>")
+    Cached streams are shown at once; otherwise the dropdown fills page by
+    page while a worker thread walks the configuration search.
+    """
+    area = project_area_picker.selected()
+    if area is not None:
+        selected_project_area = area["Project_Area_Name"]
+        project_area_uuid = area["Project_Area_UUID"]
+        global component_index, loading_project_area_uuid, stream_poll_active
+        cached_streams = stream_cache.get(project_area_uuid)
+        component_index = stream_index(cached_streams if cached_streams is not None else [])
+
+        # Update the components dropdown and clear the previous selection
+        component_picker.set_index(component_index)
+
+        loading_project_area_uuid = None if cached_streams is not None else project_area_uuid
+        if cached_streams is None:
+            threading.Thread(target=load_streams_worker, args=(project_area_uuid,), daemon=True).start()
+            if not stream_poll_active:
+                stream_poll_active = True
+                window.after(100, poll_stream_queue)
 
         # Display the selected project area name
         selected_project_area_label.config(text=f"Selected Project Area: {selected_project_area}")
 
+# Background refresh of the cached project area list
+project_area_refresh_queue = queue.Queue()
+
+def refresh_project_areas_worker():
+    """
+    Fetches the project areas from the server on a worker thread.
+    """
+    try:
+        user_project_areas = fetch_project_areas()
+        project_area_refresh_queue.put(parse_project_areas(user_project_areas) if user_project_areas else None)
+    except Exception as e:
+        log_message(f"Error refreshing project areas: {e}", "ERROR")
+        project_area_refresh_queue.put(None)
+
+def poll_project_area_refresh():
+    """
+    Applies the background refresh on the Tk thread once it has finished.
+    """
+    try:
+        fresh_project_areas = project_area_refresh_queue.get_nowait()
+    except queue.Empty:
+        window.after(200, poll_project_area_refresh)
+        return
+
+    if not fresh_project_areas:
+        log_message("Background refresh of project areas failed; keeping the cached list", "ERROR")
+        return
+
+    global project_area_catalog
+    added, removed = reconcile_project_areas(project_areas, fresh_project_areas)
+    project_area_cache.save(fresh_project_areas)
+    if added or removed:
+        project_areas[:] = fresh_project_areas
+        project_area_catalog = project_area_index(project_areas)
+        project_area_picker.set_index(project_area_catalog, keep_text=True)
+    log_message(f"Project areas refreshed: {len(added)} added, {len(removed)} removed")
+
+def on_refresh_streams_click():
+    """
+    Drops the cached streams of the selected project area and fetches them again.
+    """
+    area = project_area_picker.selected()
+    if area is not None:
+        stream_cache.invalidate(area["Project_Area_UUID"])
+        on_project_area_select(None)
+
 # Set up Tkinter window
 window = tk.Tk()
 window.title("ETM Data Report Generator")
-window.geometry("500x250")
-
-# Fetch project areas and parse them
-user_project_areas = fetch_project_areas()
-if user_project_areas:
-    project_areas = parse_project_areas(user_project_areas)
+window.geometry("760x420")
+
+# Load project areas from the on-disk cache; run with --refresh-project-areas to force a server fetch
+project_area_cache = ProjectAreaCache(server_url, username, ttl=config.get("project_area_cache_ttl", DEFAULT_PROJECT_AREA_CACHE_TTL))
+project_areas, project_areas_fetched_at = (None, None) if "--refresh-project-areas" in sys.argv else project_area_cache.load()
+refresh_project_areas_in_background = project_areas is not None and not project_area_cache.is_fresh(project_areas_fetched_at)
+if project_areas is None:
+    # Fetch project areas and parse them
+    user_project_areas = fetch_project_areas()
+    project_areas = parse_project_areas(user_project_areas) if user_project_areas else []
+    if project_areas:
+        project_area_cache.save(project_areas)
+else:
+    log_message(f"Loaded {len(project_areas)} project areas from cache")
 
-    # Project Area selection dropdown
-    project_area_combobox = ttk.Combobox(window, values=[area["Project_Area_Name"] for area in project_areas], state="readonly", width=40)
+if project_areas:
+    # Project Area selection dropdown; type to narrow the list
+    project_area_catalog = project_area_index(project_areas)
+    project_area_combobox = ttk.Combobox(window, width=40)
     project_area_combobox.grid(row=0, column=1, padx=10, pady=10)
-    project_area_combobox.bind("<<ComboboxSelected>>", on_project_area_select)
+    project_area_picker = TypeAheadPicker(project_area_combobox, project_area_catalog, on_project_area_select)
 
     # Label for project area selection
     project_area_label = tk.Label(window, text="Select Project Area:")
@@ -733,23 +1149,57 @@ if user_project_areas:
     selected_project_area_label = tk.Label(window, text="Selected Project Area: ")
     selected_project_area_label.grid(row=1, column=0, columnspan=2, padx=10, pady=10)
 
-    # Components dropdown
-    component_combobox = ttk.Combobox(window, state="readonly", width=40)
+    # Components dropdown, filled once a project area is selected
+    component_index = stream_index([])
+    component_combobox = ttk.Combobox(window, width=40)
     component_combobox.grid(row=2, column=1, padx=10, pady=10)
+    component_picker = TypeAheadPicker(component_combobox, component_index, on_component_select)
 
     # Label for components selection
     component_label = tk.Label(window, text="Select Components:")
     component_label.grid(row=2, column=0, padx=10, pady=10)
 
+    # Button to re-fetch the streams of the selected project area
+    refresh_streams_button = tk.Button(window, text="Refresh Streams", command=on_refresh_streams_click)
+    refresh_streams_button.grid(row=2, column=2, padx=10, pady=10)
+
 
     # Add a button to validate the data
     validate_button = tk.Button(window, text="Validate Data", command=on_validate_data_click)
     validate_button.grid(row=3, column=1, padx=10, pady=10)
 
+    # Add a button to abort a running validation
+    cancel_button = tk.Button(window, text="Cancel", command=on_cancel_click, state="disabled")
+    cancel_button.grid(row=3, column=2, padx=10, pady=10)
+
+    # Add a button to build the report from the last recorded counts
+    snapshot_report_button = tk.Button(window, text="Report from Snapshot", command=on_snapshot_report_click)
+    snapshot_report_button.grid(row=3, column=0, padx=10, pady=10)
+
     # Add a label to display the script status
     status_label = tk.Label(window, text="Status: Not Started", fg="black")
     status_label.grid(row=4, column=1, padx=10, pady=10)
 
+    # One progress row per artifact type, filled as each count arrives
+    progress_frame = tk.Frame(window)
+    progress_frame.grid(row=5, column=0, columnspan=3, padx=10, pady=10)
+    progress_bars = {}
+    progress_values = {}
+    progress_ages = {}
+    for row, artifact in enumerate(ARTIFACT_TYPES):
+        tk.Label(progress_frame, text=ARTIFACT_LABELS[artifact], anchor="w", width=28).grid(row=row, column=0, sticky="w")
+        progress_bars[artifact] = ttk.Progressbar(progress_frame, length=200, maximum=1)
+        progress_bars[artifact].grid(row=row, column=1, padx=5, pady=2)
+        progress_values[artifact] = tk.Label(progress_frame, text="", width=10, anchor="w")
+        progress_values[artifact].grid(row=row, column=2, sticky="w")
+        progress_ages[artifact] = tk.Label(progress_frame, text="", width=22, anchor="w", fg="gray")
+        progress_ages[artifact].grid(row=row, column=3, sticky="w")
+
+    # Reconcile a stale cached list with the server without blocking the window
+    if refresh_project_areas_in_background:
+        threading.Thread(target=refresh_project_areas_worker, daemon=True).start()
+        window.after(200, poll_project_area_refresh)
+
     # Start Tkinter main loop
     window.mainloop()
 
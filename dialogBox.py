@@ -1,12 +1,13 @@
 import json
 import requests
-from openpyxl import Workbook
+from etmExcel import write_excel
 import urllib3
 from datetime import datetime
 import os
 import xml.etree.ElementTree as ET
 import tkinter as tk
 from tkinter import ttk, messagebox
+from etmCatalog import create_stream_cache
 
 # Suppress warnings about unverified HTTPS requests
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -19,6 +20,9 @@ username = config["username"]
 password = config["password"]
 server_url = config["server_url"]
 
+# Streams already fetched in this session, keyed by project area UUID
+stream_cache = create_stream_cache(config)
+
 # API endpoints
 api_url_project_areas = f"{server_url}/qm/service/com.ibm.team.repository.service.internal.webuiInitializer.IWebUIInitializerRestService/initializationData"
 oslc_api_url_template = f"{server_url}/qm/service/com.ibm.rqm.configmanagement.service.rest.IConfigurationManagementRestService/pagedSearchResult?pageSize=100&page=0&projectArea={{Project_Area_UUID}}"
@@ -91,19 +95,16 @@ def save_to_excel(project_areas):
     file_name = f"Reports/Project_Areas_{timestamp}.xlsx"
     os.makedirs("Reports", exist_ok=True)
 
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Project Areas"
-    sheet.append(["Project Area Name", "Project Area UUID", "Stream Name", "Stream OSLC ID"])
-
-    for area in project_areas:
-        streams = area.get("Streams", [])
-        for stream in streams:
-            sheet.append([area["Project_Area_Name"], area["Project_Area_UUID"], stream["Project_Area_Stream_Name"], stream["Project_Area_Stream_OSLC_ID"]])
-        if not streams:
-            sheet.append([area["Project_Area_Name"], area["Project_Area_UUID"], "", ""])
+    def rows():
+        for area in project_areas:
+            streams = area.get("Streams", [])
+            for stream in streams:
+                yield [area["Project_Area_Name"], area["Project_Area_UUID"], stream["Project_Area_Stream_Name"], stream["Project_Area_Stream_OSLC_ID"]]
+            if not streams:
+                yield [area["Project_Area_Name"], area["Project_Area_UUID"], "", ""]
 
-    workbook.save(file_name)
+    # Rows are streamed through a write-only workbook instead of being held in memory
+    write_excel(file_name, [("Project Areas", ["Project Area Name", "Project Area UUID", "Stream Name", "Stream OSLC ID"], rows())])
     print(f"Project areas and streams saved to {file_name}")
 
 def on_project_area_select(event):
@@ -113,7 +114,7 @@ def on_project_area_select(event):
     selected_project_area = project_area_combobox.get()
     if selected_project_area:
         project_area_uuid = next(area["Project_Area_UUID"] for area in project_areas if area["Project_Area_Name"] == selected_project_area)
-        components = fetch_oslc_details(project_area_uuid)
+        components = stream_cache.get_or_fetch(project_area_uuid, fetch_oslc_details)
         
         # Update the components dropdown
         component_combobox['values'] = [comp["Project_Area_Stream_Name"] for comp in components]
@@ -123,6 +124,16 @@ def on_project_area_select(event):
         # Display the selected project area name
         selected_project_area_label.config(text=f"Selected Project Area: {selected_project_area}")
 
+def on_refresh_streams_click():
+    """
+    Drops the cached streams of the selected project area and fetches them again.
+    """
+    selected_project_area = project_area_combobox.get()
+    if selected_project_area:
+        project_area_uuid = next(area["Project_Area_UUID"] for area in project_areas if area["Project_Area_Name"] == selected_project_area)
+        stream_cache.invalidate(project_area_uuid)
+        on_project_area_select(None)
+
 # Set up Tkinter window
 window = tk.Tk()
 window.title("Project Area and Stream Selector")
@@ -155,6 +166,10 @@ if user_project_areas:
     component_label = tk.Label(window, text="Select Components:")
     component_label.grid(row=2, column=0, padx=10, pady=10)
 
+    # Button to re-fetch the streams of the selected project area
+    refresh_streams_button = tk.Button(window, text="Refresh Streams", command=on_refresh_streams_click)
+    refresh_streams_button.grid(row=2, column=2, padx=10, pady=10)
+
     # Start Tkinter main loop
     window.mainloop()
 
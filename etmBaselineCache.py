@@ -0,0 +1,76 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from etmCatalog import CACHE_DIR
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS baseline_counts (
+    configuration_id TEXT NOT NULL,
+    artifact TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (configuration_id, artifact)
+);
+"""
+
+
+class BaselineCountCache:
+    """
+    Permanent artifact counts of immutable configurations (baselines), keyed
+    by the configuration itemId, one SQLite file per server and user.
+
+    A baseline's content cannot change, so its entries never expire; counts
+    of streams must not be stored here and keep going to the server.
+    """
+
+    def __init__(self, server_url, username, cache_dir=CACHE_DIR):
+        digest = hashlib.sha1(f"{server_url.rstrip('/')}|{username}".encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(cache_dir, f"baseline_counts_{digest}.sqlite3")
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        self.hits = 0
+        self.stored = 0
+
+    def get(self, configuration_id, artifact):
+        """
+        Returns the stored count, or None if this baseline was never counted.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT count FROM baseline_counts WHERE configuration_id = ? AND artifact = ?",
+                (configuration_id, artifact)).fetchone()
+            if row is not None:
+                self.hits += 1
+        return row[0] if row is not None else None
+
+    def put(self, configuration_id, artifact, count):
+        if not isinstance(count, int) or isinstance(count, bool):
+            return
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO baseline_counts VALUES (?, ?, ?, ?)",
+                (configuration_id, artifact, count, time.time()))
+            self.stored += 1
+
+    def summary(self):
+        return f"baseline counts reused: {self.hits}, stored: {self.stored}"
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def create_baseline_cache(config, username):
+    """
+    Builds the BaselineCountCache for the configured server and user, or None
+    when baseline_count_cache is switched off in config.json.
+    """
+    if not config.get("baseline_count_cache", True):
+        return None
+    return BaselineCountCache(config["server_url"], username)
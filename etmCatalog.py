@@ -0,0 +1,386 @@
+import bisect
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from etmPaging import DEFAULT_PAGE_WORKERS, iter_pages
+from etmParse import read_json, stream_service_providers
+from etmRecords import Stream
+from etmXml import parse_page
+
+# API endpoints (relative to the server URL)
+PROJECT_AREAS_PATH = "/qm/service/com.ibm.team.repository.service.internal.webuiInitializer.IWebUIInitializerRestService/initializationData"
+CONFIGURATIONS_PATH = "/qm/service/com.ibm.rqm.configmanagement.service.rest.IConfigurationManagementRestService/pagedSearchResult"
+QM_CATALOG_PATH = "/qm/oslc_qm/catalog"
+
+# Headers asking for the OSLC 2.0 RDF/XML representation
+OSLC_HEADERS = {"Accept": "application/rdf+xml", "OSLC-Core-Version": "2.0"}
+
+# Where the project area list comes from ("project_area_source" in config.json):
+# the web UI initializer document or the OSLC QM service provider catalog
+PROJECT_AREA_SOURCES = ("initializer", "oslc_catalog")
+DEFAULT_PROJECT_AREA_SOURCE = "initializer"
+
+# Project area itemId in a service provider or project area URI
+_PROJECT_AREA_ID = re.compile(r"/(?:contexts|project-areas)/([^/]+)")
+
+# Whitespace runs, folded to one space in catalog search keys
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fetch_initializer_project_areas(client):
+    """
+    Fetches the raw userProjectAreas list from the web UI initializer.
+    Raises requests exceptions on HTTP errors and ValueError on an unexpected payload.
+    """
+    response = client.get(f"{client.server_url}{PROJECT_AREAS_PATH}", stream=True)
+    if not response.ok:
+        response.close()
+    response.raise_for_status()
+
+    data = read_json(response, client.stats)
+    if 'soapenv:Body' in data and "response" in data['soapenv:Body']:
+        return data['soapenv:Body']["response"]["returnValue"]["value"]["com.ibm.rqm.planning.service.permissionsWebUIInitializer"]["userProjectAreas"]
+    raise ValueError("Invalid response structure while fetching project areas.")
+
+
+def fetch_catalog_project_areas(client):
+    """
+    Reads the project areas from the OSLC QM service provider catalog, parsed
+    as it streams in. Returns them in the userProjectAreas shape
+    ({"name", "itemId"}) so parse_project_areas applies to both sources.
+    Raises requests exceptions on HTTP errors and ET.ParseError on a malformed catalog.
+    """
+    response = client.get(f"{client.server_url}{QM_CATALOG_PATH}", headers=OSLC_HEADERS, stream=True)
+    if not response.ok:
+        response.close()
+    response.raise_for_status()
+
+    project_areas = []
+    for provider in stream_service_providers(response, client.stats):
+        match = _PROJECT_AREA_ID.search(provider["details"] or "") or _PROJECT_AREA_ID.search(provider["about"] or "")
+        if match:
+            project_areas.append({"name": provider["title"], "itemId": match.group(1)})
+    return project_areas
+
+
+def fetch_project_areas(client, source=DEFAULT_PROJECT_AREA_SOURCE):
+    """
+    Fetches the raw project area list from the configured source.
+    """
+    if source == "oslc_catalog":
+        return fetch_catalog_project_areas(client)
+    if source == "initializer":
+        return fetch_initializer_project_areas(client)
+    raise ValueError(f"Unknown project area source {source!r}; expected one of {', '.join(PROJECT_AREA_SOURCES)}")
+
+
+def parse_project_areas(user_project_areas):
+    """
+    Parses the project areas into a simplified format.
+    """
+    return [
+        {"Project_Area_Name": area.get("name"), "Project_Area_UUID": area.get("itemId")}
+        for area in user_project_areas if area.get("name") and area.get("itemId")
+    ]
+
+
+# Configurations requested per page when enumerating the streams of a project area
+STREAM_PAGE_SIZE = 100
+
+
+# Fields of a configuration search result that may name its type, and the
+# kind each type maps to; configurations of unknown type count as mutable
+CONFIGURATION_TYPE_FIELDS = ("configurationType", "type")
+CONFIGURATION_KINDS = ("baseline", "stream")
+
+
+def configuration_kind(record):
+    """
+    "baseline", "stream" or None for one configuration search result.
+    """
+    for field in CONFIGURATION_TYPE_FIELDS:
+        value = (record.get(field) or "").lower()
+        for kind in CONFIGURATION_KINDS:
+            if kind in value:
+                return kind
+    return None
+
+
+def parse_stream_page(content):
+    """
+    Parses one pagedSearchResult page of configurations.
+    Returns (streams, total_size) with Stream records; total_size is None if
+    the page does not carry it.
+    """
+    records, total_size = parse_page(content)
+    streams = [
+        Stream(record["name"], record["itemId"], configuration_kind(record))
+        for record in records if record.get("itemId") and record.get("name")
+    ]
+    return streams, total_size
+
+
+def iter_streams(client, project_area_uuid, page_size=STREAM_PAGE_SIZE, max_workers=DEFAULT_PAGE_WORKERS, tuner=None):
+    """
+    Lazily yields every configuration (stream) of a project area as a Stream
+    record, walking all pages of the search; pages after the first are prefetched concurrently.
+    With a PageSizeTuner the page size is the tuner's pick for the endpoint.
+    """
+    url = f"{client.server_url}{CONFIGURATIONS_PATH}"
+    on_page = None
+    if tuner is not None:
+        page_size = tuner.page_size(CONFIGURATIONS_PATH, page_size)
+        on_page = tuner.observer(CONFIGURATIONS_PATH, page_size)
+
+    def fetch_page(page):
+        params = {"pageSize": page_size, "page": page, "projectArea": project_area_uuid}
+        response = client.get(url, params=params)
+        response.raise_for_status()
+        return parse_stream_page(response.content)
+
+    return iter_pages(fetch_page, page_size, max_workers, on_page=on_page, clock=client.service_time)
+
+
+def fetch_streams(client, project_area_uuid, page_size=STREAM_PAGE_SIZE, max_workers=DEFAULT_PAGE_WORKERS, tuner=None):
+    """
+    Fetches all configurations (streams) of a project area.
+    """
+    return list(iter_streams(client, project_area_uuid, page_size, max_workers, tuner))
+
+
+# Directory holding per-server/per-user catalog caches
+CACHE_DIR = "cache"
+
+# Seconds a cached project area list is considered fresh
+DEFAULT_PROJECT_AREA_CACHE_TTL = 24 * 60 * 60
+
+
+class ProjectAreaCache:
+    """
+    On-disk cache of the parsed project area list (name, itemId) for one
+    server URL and user.
+    """
+
+    def __init__(self, server_url, username, ttl=DEFAULT_PROJECT_AREA_CACHE_TTL, cache_dir=CACHE_DIR):
+        self.ttl = ttl
+        digest = hashlib.sha1(f"{server_url}|{username}".encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(cache_dir, f"project_areas_{digest}.json")
+
+    def load(self):
+        """
+        Returns (project_areas, fetched_at) or (None, None) if nothing usable is cached.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+            return data["project_areas"], data["fetched_at"]
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+    def is_fresh(self, fetched_at):
+        return fetched_at is not None and time.time() - fetched_at < self.ttl
+
+    def save(self, project_areas):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as cache_file:
+            json.dump({"fetched_at": time.time(), "project_areas": project_areas}, cache_file)
+        os.replace(temp_path, self.path)
+
+
+def reconcile_project_areas(cached, fresh):
+    """
+    Compares two project area lists by UUID.
+    Returns (added, removed) lists of project areas.
+    """
+    cached_ids = {area["Project_Area_UUID"] for area in cached}
+    fresh_ids = {area["Project_Area_UUID"] for area in fresh}
+    added = [area for area in fresh if area["Project_Area_UUID"] not in cached_ids]
+    removed = [area for area in cached if area["Project_Area_UUID"] not in fresh_ids]
+    return added, removed
+
+
+class CatalogIndex:
+    """
+    Project areas or streams (the scripts' dicts) indexed by name and by id,
+    with a case-insensitive prefix search for type-ahead pickers.
+
+    Every word of a name starts a search key running to the end of the name,
+    so "main" finds "Payments Main" as well as "Mainline". The keys are kept
+    sorted and a prefix is located with bisect, so a search costs
+    O(log n + matches) however long the list is. Where names repeat, the
+    first item wins, as the list scans it replaces did.
+    """
+
+    def __init__(self, items, name_field, id_field):
+        self.name_field = name_field
+        self.id_field = id_field
+        self.by_name = {}
+        self.by_id = {}
+        self.names = []
+        self._keys = []
+        for item in items:
+            self._add(item)
+        self._keys.sort()
+
+    def _add(self, item):
+        """
+        Indexes item; returns the new search keys, none if its name is already known.
+        """
+        name = item[self.name_field]
+        self.by_id.setdefault(item[self.id_field], item)
+        if name in self.by_name:
+            return []
+        self.by_name[name] = item
+        position = len(self.names)
+        self.names.append(name)
+        keys = [(key, position) for key in search_keys(name)]
+        self._keys.extend(keys)
+        return keys
+
+    def add(self, item):
+        """
+        Adds one item, keeping the search keys sorted (streams arrive page by page).
+        """
+        keys = self._add(item)
+        if keys:
+            del self._keys[-len(keys):]
+            for key in keys:
+                bisect.insort(self._keys, key)
+
+    def __len__(self):
+        return len(self.names)
+
+    def id_of(self, name):
+        """
+        The id of the item called name, or None if there is none.
+        """
+        item = self.by_name.get(name)
+        return item[self.id_field] if item is not None else None
+
+    def search(self, text, limit=None):
+        """
+        Names with a word starting with text, in list order.
+        Returns (names, complete); complete is False when limit cut the result short.
+        """
+        prefix = fold_name(text).lstrip()
+        if not prefix:
+            names = self.names if limit is None else self.names[:limit]
+            return names, len(names) == len(self.names)
+        positions = set()
+        complete = True
+        for key, position in self._keys[bisect.bisect_left(self._keys, (prefix,)):]:
+            if not key.startswith(prefix):
+                break
+            if position not in positions and limit is not None and len(positions) == limit:
+                complete = False
+                break
+            positions.add(position)
+        return [self.names[position] for position in sorted(positions)], complete
+
+
+def fold_name(text):
+    """
+    Case-folded text with runs of whitespace collapsed to one space.
+    """
+    return _WHITESPACE.sub(" ", text.casefold())
+
+
+def search_keys(name):
+    """
+    The case-folded name from the start of each of its words.
+    """
+    folded = fold_name(name).strip()
+    keys = [folded]
+    for index, character in enumerate(folded):
+        if character == " ":
+            keys.append(folded[index + 1:])
+    return keys
+
+
+def matches_search(name, text):
+    """
+    True if CatalogIndex.search(text) would return name.
+    """
+    prefix = fold_name(text).lstrip()
+    return any(key.startswith(prefix) for key in search_keys(name))
+
+
+def project_area_index(project_areas):
+    return CatalogIndex(project_areas, "Project_Area_Name", "Project_Area_UUID")
+
+
+def stream_index(streams):
+    return CatalogIndex(streams, "Project_Area_Stream_Name", "Project_Area_Stream_OSLC_ID")
+
+
+# Defaults for the in-session stream cache
+DEFAULT_STREAM_CACHE_SIZE = 64
+DEFAULT_STREAM_CACHE_TTL = 10 * 60
+
+
+class StreamCache:
+    """
+    In-memory LRU of project area UUID -> streams with a time-to-live.
+
+    Empty stream lists are not cached: the fetch_oslc_details functions
+    return [] on errors, and those should be retried on the next selection.
+    """
+
+    def __init__(self, maxsize=DEFAULT_STREAM_CACHE_SIZE, ttl=DEFAULT_STREAM_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, project_area_uuid):
+        """
+        Returns the cached streams, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(project_area_uuid)
+            if entry is None:
+                return None
+            fetched_at, streams = entry
+            if time.monotonic() - fetched_at >= self.ttl:
+                del self._entries[project_area_uuid]
+                return None
+            self._entries.move_to_end(project_area_uuid)
+            return streams
+
+    def put(self, project_area_uuid, streams):
+        if not streams:
+            return
+        with self._lock:
+            self._entries[project_area_uuid] = (time.monotonic(), streams)
+            self._entries.move_to_end(project_area_uuid)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_fetch(self, project_area_uuid, fetch):
+        """
+        Returns the cached streams or calls fetch(project_area_uuid) and caches the result.
+        """
+        streams = self.get(project_area_uuid)
+        if streams is None:
+            streams = fetch(project_area_uuid)
+            self.put(project_area_uuid, streams)
+        return streams
+
+    def invalidate(self, project_area_uuid):
+        with self._lock:
+            self._entries.pop(project_area_uuid, None)
+
+
+def create_stream_cache(config):
+    """
+    Builds a StreamCache sized from stream_cache_size / stream_cache_ttl in config.json.
+    """
+    return StreamCache(
+        config.get("stream_cache_size", DEFAULT_STREAM_CACHE_SIZE),
+        config.get("stream_cache_ttl", DEFAULT_STREAM_CACHE_TTL),
+    )
@@ -0,0 +1,554 @@
+import getpass
+import json
+import socket
+import threading
+import time
+import weakref
+from urllib.parse import parse_qsl
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from etmBaselineCache import create_baseline_cache
+from etmHedge import create_hedger
+from etmHttpCache import REVALIDATED_METHODS, create_http_cache
+from etmLimiter import DEFAULT_LIMITS, RETRY_STATUS_CODES, backoff_delay, create_limiter, retry_after_delay, server_limits
+
+# Suppress warnings about unverified HTTPS requests
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# Default number of keep-alive connections kept per ETM host
+DEFAULT_POOL_SIZE = 10
+
+# Seconds to wait for the server before a request counts as timed out
+DEFAULT_REQUEST_TIMEOUT = 300
+
+# Seconds a parsed result is served to identical requests within a run
+DEFAULT_MEMO_TTL = 60
+
+
+class RequestCancelled(requests.exceptions.RequestException):
+    """
+    Raised for requests aborted through ETMClient.cancel() or a CancelToken.
+    """
+
+
+class CancelToken:
+    """
+    Cancels the calls of one job on a shared ETMClient, leaving the calls
+    other threads make on the same client running.
+
+    A thread takes part in the job between join() and leave(); bind(fn)
+    wraps a callable so that whichever thread runs it joins for the call.
+    cancel() makes the joined threads' calls raise RequestCancelled and
+    shuts down the sockets they have checked out.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = {}
+
+    def join(self):
+        """
+        Makes the calling thread's requests part of this job; returns the
+        token it was joined to before, to be passed to leave().
+        """
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+        previous = getattr(self._client._local, "cancel_token", None)
+        self._client._local.cancel_token = self
+        return previous
+
+    def leave(self, previous=None):
+        ident = threading.get_ident()
+        with self._lock:
+            if self._threads.get(ident, 0) <= 1:
+                self._threads.pop(ident, None)
+            else:
+                self._threads[ident] -= 1
+        self._client._local.cancel_token = previous
+
+    def bind(self, fn):
+        """
+        Wraps fn so that the thread running it is joined for the call.
+        """
+        def run(*args, **kwargs):
+            previous = self.join()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.leave(previous)
+        return run
+
+    def cancel(self):
+        self._event.set()
+        with self._lock:
+            threads = list(self._threads)
+        for ident in threads:
+            self._client._adapter.abort_thread_connection(ident)
+
+    def cancelled(self):
+        return self._event.is_set()
+
+    def wait(self, timeout):
+        return self._event.wait(timeout)
+
+
+class ConnectionStats:
+    """
+    Thread-safe counters for requests sent and TCP/TLS connections opened.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.opened = 0
+        self.retries = 0
+        self.bytes_read = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_open(self):
+        with self._lock:
+            self.opened += 1
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def record_bytes(self, count):
+        with self._lock:
+            self.bytes_read += count
+
+    @property
+    def reused(self):
+        return max(self.requests - self.opened, 0)
+
+    def summary(self):
+        return (
+            f"HTTP requests: {self.requests}, connections opened: {self.opened}, "
+            f"connections reused: {self.reused}, retries: {self.retries}, body bytes read: {self.bytes_read}"
+        )
+
+
+def _canonical(value):
+    """
+    Order-independent, hashable form of request params or a form body.
+    """
+    if value is None:
+        return ()
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    if isinstance(value, str):
+        return tuple(sorted(parse_qsl(value, keep_blank_values=True)))
+    items = value.items() if isinstance(value, dict) else value
+    return tuple(sorted((str(key), str(item)) for key, item in items))
+
+
+def _latency_key(method, url, params=None, data=None):
+    """
+    Request kind the limiter keeps a latency baseline for: method, endpoint and page size.
+    """
+    if isinstance(data, (str, bytes)) and params is None:
+        params = data.decode("utf-8") if isinstance(data, bytes) else data
+    if isinstance(params, str):
+        params = dict(parse_qsl(params))
+    page_size = params.get("pageSize") if isinstance(params, dict) else None
+    return method.upper(), url, str(page_size) if page_size is not None else None
+
+
+def request_key(method, url, params=None, data=None):
+    """
+    Key identifying a query by endpoint, method and canonicalized params/body.
+    """
+    return (method.upper(), url, _canonical(params), _canonical(data))
+
+
+class SingleFlight:
+    """
+    Collapses identical calls: concurrent callers with the same key share one
+    in-flight call, and successful results are memoized for `ttl` seconds.
+    Failures are handed to every waiter but never memoized.
+    """
+
+    def __init__(self, ttl=DEFAULT_MEMO_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._memo = {}
+        self.calls = 0
+        self.shared = 0
+        self.memo_hits = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            memoized = self._memo.get(key)
+            if memoized is not None and memoized[0] > time.monotonic():
+                self.memo_hits += 1
+                return memoized[1]
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = {"done": threading.Event(), "result": None, "error": None}
+                self._in_flight[key] = call
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+
+        try:
+            call["result"] = fn()
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                if call["error"] is None and self.ttl > 0:
+                    self._purge_expired()
+                    self._memo[key] = (time.monotonic() + self.ttl, call["result"])
+            call["done"].set()
+        return call["result"]
+
+    def _purge_expired(self):
+        if len(self._memo) < 1024:
+            return
+        now = time.monotonic()
+        for key in [key for key, (expires, _) in self._memo.items() if expires <= now]:
+            del self._memo[key]
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+
+    def summary(self):
+        return f"queries sent: {self.calls}, coalesced: {self.shared}, memo hits: {self.memo_hits}"
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose connection pools report every new connection to a
+    ConnectionStats and remember it so in-flight calls can be aborted, all
+    of them or the one a given thread has checked out.
+    """
+
+    def __init__(self, stats, pool_size):
+        self._stats = stats
+        self._connections = weakref.WeakSet()
+        self._in_use = {}
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        stats = self._stats
+        connections = self._connections
+        in_use = self._in_use
+
+        class CountingPool:
+            def _new_conn(self):
+                stats.record_open()
+                conn = super()._new_conn()
+                connections.add(conn)
+                return conn
+
+            def _get_conn(self, timeout=None):
+                conn = super()._get_conn(timeout)
+                in_use[threading.get_ident()] = conn
+                return conn
+
+            def _put_conn(self, conn):
+                if in_use.get(threading.get_ident()) is conn:
+                    in_use.pop(threading.get_ident(), None)
+                super()._put_conn(conn)
+
+        class CountingHTTPConnectionPool(CountingPool, HTTPConnectionPool):
+            pass
+
+        class CountingHTTPSConnectionPool(CountingPool, HTTPSConnectionPool):
+            pass
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool,
+        }
+
+    def abort_connections(self):
+        """
+        Shuts down every open socket, making blocked reads in other threads fail.
+        Idle pooled connections are detected as dropped and replaced on reuse.
+        """
+        for conn in list(self._connections):
+            _shutdown(conn)
+
+    def abort_thread_connection(self, thread_id):
+        """
+        Shuts down the socket the given thread is using, if it has one checked out.
+        """
+        conn = self._in_use.get(thread_id)
+        if conn is not None:
+            _shutdown(conn)
+
+
+def _shutdown(conn):
+    sock = getattr(conn, "sock", None)
+    if sock is None:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class ETMClient:
+    """
+    Shared ETM REST client.
+
+    Wraps a single requests.Session so every call reuses pooled keep-alive
+    connections, the Basic-auth credentials and the JSESSIONID cookie issued by
+    the server on the first request. Every call passes through an adaptive
+    concurrency limiter and is retried with jittered backoff when the server
+    reports overload or times out. With a Hedger, slow count queries are
+    sent a second time and the first answer is used.
+    """
+
+    def __init__(self, server_url, username, password, pool_size=DEFAULT_POOL_SIZE, verify=False,
+                 limits=None, timeout=DEFAULT_REQUEST_TIMEOUT, memo_ttl=DEFAULT_MEMO_TTL, http_cache=None,
+                 baseline_cache=None, hedger=None):
+        self.server_url = server_url
+        self.username = username
+        self.timeout = timeout
+        self.stats = ConnectionStats()
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.limiter = create_limiter(self.limits)
+        self.single_flight = SingleFlight(memo_ttl)
+        self.http_cache = http_cache
+        self.baseline_cache = baseline_cache
+        self.hedger = hedger
+        self._cancelled = threading.Event()
+        self._local = threading.local()
+        # Keep a pooled connection for every request the limiter may let through
+        self.pool_size = max(pool_size, self.limits["max"])
+
+        self.session = requests.Session()
+        self.session.auth = (username, password)
+        self.session.verify = verify
+        self._adapter = _CountingHTTPAdapter(self.stats, self.pool_size)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends a request over the pooled session, waiting for a limiter slot
+        and retrying overload responses and timeouts with jittered backoff.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        latency_key = _latency_key(method, url, kwargs.get("params"), kwargs.get("data"))
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            if self._call_cancelled():
+                self.limiter.release(0.0, key=latency_key, sample=False)
+                raise RequestCancelled(f"Request to {url} was cancelled")
+            start = time.monotonic()
+            try:
+                self.stats.record_request()
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                self._add_service_time(time.monotonic() - start)
+                self.limiter.release(time.monotonic() - start, overloaded=not self._call_cancelled(), key=latency_key, sample=False)
+                if self._call_cancelled():
+                    raise RequestCancelled(f"Request to {url} was cancelled") from e
+                if attempt >= self.limits["max_retries"]:
+                    raise
+                delay = backoff_delay(attempt, self.limits["backoff_base"], self.limits["backoff_max"])
+            except Exception:
+                self.limiter.release(time.monotonic() - start, key=latency_key, sample=False)
+                raise
+            else:
+                self._add_service_time(time.monotonic() - start)
+                overloaded = response.status_code in RETRY_STATUS_CODES
+                self.limiter.release(time.monotonic() - start, overloaded=overloaded, key=latency_key)
+                if not overloaded or attempt >= self.limits["max_retries"]:
+                    if not kwargs.get("stream"):
+                        self.stats.record_bytes(len(response.content))
+                    return response
+                delay = retry_after_delay(response, self.limits["backoff_max"])
+                if delay is None:
+                    delay = backoff_delay(attempt, self.limits["backoff_base"], self.limits["backoff_max"])
+                response.close()
+            attempt += 1
+            self.stats.record_retry()
+            token = getattr(self._local, "cancel_token", None)
+            if (token or self._cancelled).wait(delay) or self._call_cancelled():
+                raise RequestCancelled(f"Request to {url} was cancelled")
+
+    def _call_cancelled(self):
+        """
+        True after cancel(), after the calling thread's CancelToken was
+        cancelled, or when the calling thread's hedged attempt has lost.
+        """
+        abandoned = getattr(self._local, "abandoned", None)
+        token = getattr(self._local, "cancel_token", None)
+        return (self._cancelled.is_set() or (abandoned is not None and abandoned.is_set())
+                or (token is not None and token.cancelled()))
+
+    def _add_service_time(self, seconds):
+        self._local.service_time = self.service_time() + seconds
+
+    def service_time(self):
+        """
+        Seconds the calling thread has spent waiting on the server, excluding
+        limiter queueing and retry backoff. Bodies of streamed responses are
+        read later and not included.
+        """
+        return getattr(self._local, "service_time", 0.0)
+
+    def fetch_once(self, method, url, parse, hedge=False, **kwargs):
+        """
+        Sends a streamed request and returns parse(response, stats).
+
+        Identical queries (same endpoint, method and canonicalized params/body)
+        share one in-flight call, and the parsed result is reused for the
+        memo TTL, so duplicate queries in a run never reach the server.
+        With an HttpCache, a GET answered before is sent with the stored
+        validators and a 304 Not Modified returns the stored result.
+        With hedge and a Hedger, a query slower than its endpoint usually is
+        sent again on another pooled connection and the first answer wins.
+        """
+        key = request_key(method, url, kwargs.get("params"), kwargs.get("data"))
+
+        def call():
+            cache_key = entry = None
+            request_kwargs = kwargs
+            if self.http_cache is not None and method.upper() in REVALIDATED_METHODS:
+                cache_key = self.http_cache.cache_key(key, parse.__name__)
+                entry = self.http_cache.lookup(cache_key)
+                if entry is not None:
+                    request_kwargs = dict(kwargs, headers=dict(kwargs.get("headers") or {}, **entry.conditional_headers()))
+                    self.http_cache.record_revalidation()
+                else:
+                    self.http_cache.record_miss()
+
+            # Hedged attempts run on their own threads; they join the caller's token
+            token = getattr(self._local, "cancel_token", None)
+
+            def send(abandoned=None):
+                self._local.abandoned = abandoned
+                previous = token.join() if token is not None else None
+                try:
+                    response = self.request(method, url, stream=True, **request_kwargs)
+                    if entry is not None and response.status_code == 304:
+                        response.close()
+                        return None, None
+                    if not response.ok:
+                        response.close()
+                    response.raise_for_status()
+                    return response.headers, parse(response, self.stats)
+                finally:
+                    if token is not None:
+                        token.leave(previous)
+                    self._local.abandoned = None
+
+            if hedge and self.hedger is not None:
+                latency_key = _latency_key(method, url, kwargs.get("params"), kwargs.get("data"))
+                headers, result = self.hedger.run(latency_key, send, self._adapter.abort_thread_connection)
+            else:
+                headers, result = send()
+            if headers is None:
+                self.http_cache.record_hit()
+                self.http_cache.revalidated(cache_key)
+                return entry.value
+            if cache_key is not None:
+                self.http_cache.store(cache_key, key, headers, result)
+            return result
+
+        return self.single_flight.do(key, call)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def cancel(self):
+        """
+        Aborts in-flight requests and makes new ones raise RequestCancelled
+        until reset_cancel() is called.
+        """
+        self._cancelled.set()
+        self._adapter.abort_connections()
+
+    def reset_cancel(self):
+        self._cancelled.clear()
+
+    def cancel_token(self):
+        """
+        A CancelToken for cancelling one job's calls without affecting the others.
+        """
+        return CancelToken(self)
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def connection_summary(self):
+        """
+        Returns a one-line report of connections opened versus reused.
+        """
+        summary = f"{self.stats.summary()}, {self.single_flight.summary()}, {self.limiter.summary()}"
+        if self.http_cache is not None:
+            summary = f"{summary}, {self.http_cache.summary()}"
+        if self.baseline_cache is not None:
+            summary = f"{summary}, {self.baseline_cache.summary()}"
+        if self.hedger is not None:
+            summary = f"{summary}, {self.hedger.summary()}"
+        return summary
+
+    def close(self):
+        self.session.close()
+        if self.http_cache is not None:
+            self.http_cache.close()
+        if self.baseline_cache is not None:
+            self.baseline_cache.close()
+
+
+def create_client(config, username, password, pool_size=None):
+    """
+    Builds an ETMClient from the loaded config.json and the user's credentials.
+    """
+    return ETMClient(
+        config["server_url"],
+        username,
+        password,
+        pool_size=pool_size or config.get("connection_pool_size", DEFAULT_POOL_SIZE),
+        limits=server_limits(config, config["server_url"]),
+        timeout=config.get("request_timeout", DEFAULT_REQUEST_TIMEOUT),
+        memo_ttl=config.get("request_memo_ttl", DEFAULT_MEMO_TTL),
+        http_cache=create_http_cache(config, username),
+        baseline_cache=create_baseline_cache(config, username),
+        hedger=create_hedger(config),
+    )
+
+
+def load_config(config_path="config.json"):
+    with open(config_path, "r") as config_file:
+        return json.load(config_file)
+
+
+def prompt_client(config, pool_size=None):
+    """
+    Builds an ETMClient for command-line tools, prompting for credentials
+    that are not stored in config.json.
+    """
+    username = config.get("username") or input("Username: ")
+    password = config.get("password") or getpass.getpass("Password: ")
+    return create_client(config, username, password, pool_size)
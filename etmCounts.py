@@ -0,0 +1,259 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from etmClient import load_config, prompt_client
+from etmParse import stream_json_value, stream_xml_value
+
+# Artifact types covered by the data governance limits, in report order
+ARTIFACT_TYPES = (
+    "test_plan",
+    "test_case",
+    "test_script",
+    "test_suite",
+    "test_case_execution_record",
+)
+
+# Display names per artifact type
+ARTIFACT_LABELS = {
+    "test_plan": "Test Plans",
+    "test_case": "Test Cases",
+    "test_script": "Test Scripts",
+    "test_suite": "Test Suites",
+    "test_case_execution_record": "Test Case Execution Records",
+}
+
+# config.json key holding the data governance limit per artifact type
+GOVERNANCE_LIMIT_KEYS = {
+    "test_plan": "data_governance_TP",
+    "test_case": "data_governance_TC",
+    "test_script": "data_governance_TS",
+    "test_suite": "data_governance_TSuite",
+    "test_case_execution_record": "data_governance_TCER",
+}
+
+# Seconds a recorded count may be shown while a fresh one is being fetched,
+# unless count_staleness_limits in config.json sets it for the artifact type
+DEFAULT_STALENESS_LIMIT = 24 * 60 * 60
+
+# pagedSearchResult endpoint (HTTP method, path) per artifact type
+ARTIFACT_ENDPOINTS = {
+    "test_plan": ("GET", "/qm/service/com.ibm.rqm.planning.common.service.rest.ITestPlanRestService/pagedSearchResult"),
+    "test_case": ("POST", "/qm/service/com.ibm.rqm.planning.common.service.rest.ITestCaseRestService/pagedSearchResult"),
+    "test_script": ("GET", "/qm/service/com.ibm.rqm.execution.common.service.rest.IExecutionScriptSearchRestService/pagedSearchResult"),
+    "test_suite": ("GET", "/qm/service/com.ibm.rqm.planning.common.service.rest.ITestSuiteRestService/pagedSearchResult"),
+    "test_case_execution_record": ("POST", "/qm/service/com.ibm.rqm.execution.common.service.rest.ITestcaseExecutionRecordRestService/pagedSearchResult"),
+}
+
+# Headers for the form-encoded POST searches (the TCER search answers in JSON)
+POST_HEADERS = {
+    "test_case": {
+        "Content-Type": "application/x-www-form-urlencoded; charset=utf-8",
+        "Accept": "application/json",
+    },
+    "test_case_execution_record": {
+        "Content-Type": "application/x-www-form-urlencoded; charset=utf-8",
+        "Accept": "text/json",
+    },
+}
+
+# Smallest page the paged search accepts; only totalSize is read in count mode
+COUNT_PAGE_SIZE = 1
+
+# Page size the scripts used before count mode, kept for verification
+FULL_PAGE_SIZE = 500
+
+
+def staleness_limits(config):
+    """
+    Staleness limit in seconds per artifact type, from count_staleness_limits
+    in config.json (e.g. {"test_case_execution_record": 3600}).
+    """
+    limits = config.get("count_staleness_limits", {})
+    return {artifact: limits.get(artifact, DEFAULT_STALENESS_LIMIT) for artifact in ARTIFACT_TYPES}
+
+
+def count_query_params(project_area_uuid, oslc_id, page_size=COUNT_PAGE_SIZE):
+    """
+    Query parameters for a GET pagedSearchResult that only needs totalSize.
+    """
+    return {
+        "processArea": project_area_uuid,
+        "oslc_config.context": oslc_id,
+        "page": 0,
+        "pageSize": page_size,
+    }
+
+
+def count_request_body(project_area_uuid, oslc_id, page_size=COUNT_PAGE_SIZE):
+    """
+    Form body for a POST pagedSearchResult that only needs totalSize.
+
+    Every resolve* option and custom attribute expansion is switched off so the
+    server does not build data that is thrown away.
+    """
+    body = {
+        "includeCustomAttributes": "false",
+        "includeArchived": "false",
+        "processArea": project_area_uuid,
+        "traceabilityViewType": "true",
+        "resolveParentTestPlans": "false",
+        "resolveScripts": "false",
+        "resolveParentTestSuites": "false",
+        "resolveCategories": "false",
+        "resolveCustomAttributes": "false",
+        "resolveLinkedFiles": "false",
+        "resolveDevItem": "false",
+        "resolveCopiedArtifactInfo": "false",
+        "page": "0",
+        "pageSize": str(page_size),
+        "resultLimit": "-1",
+        "oslc_config.context": oslc_id,
+        "isWebUI": "true",
+    }
+    return "&".join(f"{key}={value}" for key, value in body.items())
+
+
+def full_page_request_body(project_area_uuid, oslc_id, page_size=FULL_PAGE_SIZE, page=0):
+    """
+    Form body matching the scripts' original build_request_body (resolve options on).
+    """
+    body = {
+        "includeCustomAttributes": "true",
+        "includeArchived": "false",
+        "processArea": project_area_uuid,
+        "traceabilityViewType": "true",
+        "resolveParentTestPlans": "false",
+        "resolveScripts": "false",
+        "resolveParentTestSuites": "true",
+        "resolveCategories": "true",
+        "resolveCustomAttributes": "false",
+        "resolveLinkedFiles": "false",
+        "resolveDevItem": "false",
+        "resolveCopiedArtifactInfo": "false",
+        "page": str(page),
+        "pageSize": str(page_size),
+        "resultLimit": "-1",
+        "oslc_config.context": oslc_id,
+        "isWebUI": "true",
+    }
+    return "&".join(f"{key}={value}" for key, value in body.items())
+
+
+def read_total_size(response, stats=None):
+    """
+    Reads <totalSize> from a pagedSearchResult XML response.
+
+    totalSize is the size of the whole result set; resultSetSize is capped at
+    the page size and must not be used as a count. Returns None if absent.
+    The body is parsed incrementally and reading stops at </totalSize>, so
+    request it with stream=True.
+    """
+    total_size = stream_xml_value(response, ("totalSize",), stats=stats)
+    return int(total_size) if total_size is not None else None
+
+
+def read_json_total_size(response, stats=None):
+    """
+    Reads soapenv:Body.response.returnValue.value.totalSize from a JSON search
+    response, scanning incrementally and stopping once the value is read.
+    """
+    total_size = stream_json_value(response, stats=stats)
+    return int(total_size) if total_size is not None else None
+
+
+def fetch_artifact_count(client, artifact, project_area_uuid, oslc_id, count_mode=True, immutable=False):
+    """
+    Fetches the total number of artifacts of one type in a project area stream.
+
+    With count_mode the smallest page is requested; otherwise the original
+    500-row page is downloaded (used to verify count mode). For an immutable
+    configuration (a baseline) the count is taken from, or stored in, the
+    client's permanent BaselineCountCache.
+    """
+    baseline_cache = client.baseline_cache if immutable and count_mode else None
+    if baseline_cache is not None:
+        count = baseline_cache.get(oslc_id, artifact)
+        if count is None:
+            count = _query_artifact_count(client, artifact, project_area_uuid, oslc_id, count_mode)
+            baseline_cache.put(oslc_id, artifact, count)
+        return count
+    return _query_artifact_count(client, artifact, project_area_uuid, oslc_id, count_mode)
+
+
+def _query_artifact_count(client, artifact, project_area_uuid, oslc_id, count_mode):
+    method, path = ARTIFACT_ENDPOINTS[artifact]
+    url = f"{client.server_url}{path}"
+    parse = read_json_total_size if artifact == "test_case_execution_record" else read_total_size
+    if method == "GET":
+        params = count_query_params(project_area_uuid, oslc_id) if count_mode else count_query_params(project_area_uuid, oslc_id, FULL_PAGE_SIZE)
+        return client.fetch_once("GET", url, parse, hedge=count_mode, params=params)
+    body = count_request_body(project_area_uuid, oslc_id) if count_mode else full_page_request_body(project_area_uuid, oslc_id)
+    return client.fetch_once("POST", url, parse, hedge=count_mode, data=body, headers=POST_HEADERS[artifact])
+
+
+def verify_count_mode(client, streams, artifacts=ARTIFACT_TYPES):
+    """
+    Compares the count-mode total against the full-page total for each stream.
+
+    streams is an iterable of (project_area_uuid, oslc_id) pairs.
+    Returns a list of (project_area_uuid, oslc_id, artifact, cheap, full) mismatches.
+    """
+    mismatches = []
+    for project_area_uuid, oslc_id in streams:
+        for artifact in artifacts:
+            cheap = fetch_artifact_count(client, artifact, project_area_uuid, oslc_id, count_mode=True)
+            full = fetch_artifact_count(client, artifact, project_area_uuid, oslc_id, count_mode=False)
+            status = "OK" if cheap == full else "MISMATCH"
+            print(f"{status} {artifact} {project_area_uuid} {oslc_id}: count mode={cheap}, full page={full}")
+            if cheap != full:
+                mismatches.append((project_area_uuid, oslc_id, artifact, cheap, full))
+    return mismatches
+
+
+def fetch_counts_concurrently(fetchers, max_workers=len(ARTIFACT_TYPES), default=None, on_result=None):
+    """
+    Runs the count fetchers on a bounded thread pool and merges their results.
+
+    fetchers maps an artifact type to a zero-argument callable returning its count.
+    A fetcher that raises or returns something other than an int gets `default`
+    (None, shown as "Error") for its artifact; the remaining fetchers are not
+    cancelled.
+    on_result(artifact, count, error) is called as each fetcher finishes.
+    Returns (counts, errors) where errors maps artifact type to the failure.
+    """
+    counts = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(fetchers)))) as executor:
+        futures = {executor.submit(fetcher): artifact for artifact, fetcher in fetchers.items()}
+        for future in as_completed(futures):
+            artifact = futures[future]
+            try:
+                value = future.result()
+            except Exception as e:
+                errors[artifact] = e
+                value = default
+            if not isinstance(value, int) or isinstance(value, bool):
+                errors.setdefault(artifact, f"unexpected count value {value!r}")
+                value = default
+            counts[artifact] = value
+            if on_result is not None:
+                on_result(artifact, value, errors.get(artifact))
+    return counts, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ETM artifact count queries")
+    parser.add_argument("--verify-count-mode", action="store_true",
+                        help="compare count-mode totals against full 500-row pages")
+    parser.add_argument("--stream", action="append", default=[], metavar="PA_UUID:OSLC_ID",
+                        help="stream to verify (repeatable); defaults to the pair in config.json")
+    args = parser.parse_args()
+
+    config = load_config()
+    client = prompt_client(config)
+    if args.verify_count_mode:
+        pairs = [tuple(s.split(":", 1)) for s in args.stream] or [(config["project_area_id"], config["Project_Area_Stream_OSLC_ID"])]
+        mismatches = verify_count_mode(client, pairs)
+        print(f"{len(mismatches)} mismatches across {len(pairs)} streams")
+        print(client.connection_summary())
+    else:
+        parser.print_help()
@@ -0,0 +1,71 @@
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+
+# Header style applied when style_header is on
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
+
+
+class ExcelExportSink:
+    """
+    Streams rows into an .xlsx file with openpyxl's write-only workbook.
+
+    Rows are taken from any iterable (typically a generator) and written out
+    as they come, so memory stays flat however many rows are exported.
+    Sheets are written one after another; the file is produced by save().
+    """
+
+    def __init__(self, file_name, style_header=True):
+        self.file_name = file_name
+        self.style_header = style_header
+        self.workbook = Workbook(write_only=True)
+        self.row_counts = {}
+
+    def add_sheet(self, title, header, rows):
+        """
+        Writes a sheet with the given header row and data rows.
+        Returns the number of data rows written.
+        """
+        sheet = self.workbook.create_sheet(title)
+        if self.style_header:
+            sheet.append([self._header_cell(sheet, value) for value in header])
+        else:
+            sheet.append(list(header))
+
+        count = 0
+        for row in rows:
+            sheet.append(row)
+            count += 1
+        self.row_counts[title] = count
+        return count
+
+    def _header_cell(self, sheet, value):
+        cell = WriteOnlyCell(sheet, value=value)
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        return cell
+
+    def save(self):
+        self.workbook.save(self.file_name)
+        return self.file_name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.save()
+        else:
+            self.workbook.close()
+
+
+def write_excel(file_name, sheets, style_header=True):
+    """
+    Writes (title, header, rows) sheets to file_name through an ExcelExportSink.
+    Returns {title: data row count}.
+    """
+    with ExcelExportSink(file_name, style_header) as sink:
+        for title, header, rows in sheets:
+            sink.add_sheet(title, header, rows)
+    return sink.row_counts
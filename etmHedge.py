@@ -0,0 +1,155 @@
+import math
+import queue
+import threading
+import time
+from collections import deque
+
+# Defaults used when config.json has no request_hedging entry
+DEFAULT_HEDGING = {
+    "enabled": False,       # hedging is opt-in
+    "percentile": 95,       # latency percentile after which a duplicate is sent
+    "budget_percent": 5.0,  # hedges allowed per endpoint, as a percentage of its calls
+    "min_samples": 20,      # latencies observed before an endpoint is hedged
+    "window": 200,          # recent latencies the percentile is taken over
+}
+
+
+class _Attempt:
+    """
+    One copy of a hedged call running on its own thread.
+    """
+
+    __slots__ = ("abandoned", "thread", "started")
+
+    def __init__(self, target):
+        self.abandoned = threading.Event()
+        self.started = time.monotonic()
+        self.thread = threading.Thread(target=target, args=(self,), daemon=True)
+
+
+class Hedger:
+    """
+    Sends a duplicate of a slow call and takes whichever answer comes first.
+
+    Latencies are kept per endpoint (ETMClient's latency key). Once an
+    endpoint has min_samples of them, a call still running after the
+    endpoint's percentile latency is sent a second time; the first
+    successful answer wins and the other attempt is abandoned. Each
+    endpoint may hedge at most budget_percent of its calls, so hedging
+    never adds more than that share of extra requests.
+    """
+
+    def __init__(self, percentile=95, budget_percent=5.0, min_samples=20, window=200):
+        self.percentile = percentile
+        self.budget = budget_percent / 100.0
+        self.min_samples = min_samples
+        self.window = window
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._calls = {}
+        self._hedges = {}
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def delay(self, key):
+        """
+        Seconds after which a call to key is hedged, or None while too few latencies are known.
+        """
+        with self._lock:
+            latencies = self._latencies.get(key)
+            if latencies is None or len(latencies) < self.min_samples:
+                return None
+            ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(len(ordered) * self.percentile / 100.0) - 1)]
+
+    def _within_budget(self, key):
+        return self._hedges.get(key, 0) + 1 <= self.budget * self._calls.get(key, 0)
+
+    def _take_budget(self, key):
+        with self._lock:
+            if not self._within_budget(key):
+                return False
+            self._hedges[key] = self._hedges.get(key, 0) + 1
+            self.hedged += 1
+            return True
+
+    def _record(self, key, latency, hedge_won=False):
+        with self._lock:
+            latencies = self._latencies.get(key)
+            if latencies is None:
+                latencies = self._latencies[key] = deque(maxlen=self.window)
+            latencies.append(latency)
+            if hedge_won:
+                self.hedge_wins += 1
+
+    def run(self, key, attempt, abort):
+        """
+        Returns attempt(abandoned) for a call to endpoint key, hedging it when slow.
+
+        abandoned is a threading.Event set once the other attempt has won;
+        abort(thread_id) is then called to stop the losing attempt's request.
+        """
+        with self._lock:
+            self._calls[key] = self._calls.get(key, 0) + 1
+            can_hedge = self._within_budget(key)
+        delay = self.delay(key) if can_hedge else None
+        if delay is None:
+            started = time.monotonic()
+            result = attempt(threading.Event())
+            self._record(key, time.monotonic() - started)
+            return result
+
+        outcomes = queue.Queue()
+
+        def target(current):
+            try:
+                outcomes.put((current, attempt(current.abandoned), None))
+            except Exception as e:
+                outcomes.put((current, None, e))
+
+        attempts = [_Attempt(target)]
+        attempts[0].thread.start()
+        pending = 1
+        error = None
+        while pending:
+            timeout = None
+            if len(attempts) == 1 and delay is not None:
+                timeout = max(0.0, delay - (time.monotonic() - attempts[0].started))
+            try:
+                finished, result, failure = outcomes.get(timeout=timeout)
+            except queue.Empty:
+                delay = None
+                if self._take_budget(key):
+                    attempts.append(_Attempt(target))
+                    attempts[1].thread.start()
+                    pending += 1
+                continue
+            pending -= 1
+            if failure is None:
+                # The call's latency runs from its first attempt, whichever attempt answered
+                self._record(key, time.monotonic() - attempts[0].started, hedge_won=finished is not attempts[0])
+                for other in attempts:
+                    if other is not finished and other.thread.is_alive():
+                        other.abandoned.set()
+                        abort(other.thread.ident)
+                return result
+            error = error or failure
+        raise error
+
+    def summary(self):
+        return f"hedged requests: {self.hedged}, won by the hedge: {self.hedge_wins}"
+
+
+def create_hedger(config):
+    """
+    Builds a Hedger from request_hedging in config.json, or None unless hedging is enabled there.
+    """
+    settings = dict(DEFAULT_HEDGING, **config.get("request_hedging", {}))
+    if not settings["enabled"]:
+        return None
+    return Hedger(
+        percentile=settings["percentile"],
+        budget_percent=settings["budget_percent"],
+        min_samples=settings["min_samples"],
+        window=settings["window"],
+    )
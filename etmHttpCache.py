@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from etmCatalog import CACHE_DIR
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    cache_key TEXT PRIMARY KEY,
+    method TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    project_area_uuid TEXT,
+    oslc_context TEXT,
+    query TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    validated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_stream ON responses (project_area_uuid, oslc_context);
+"""
+
+# Methods a server may answer 304 Not Modified; a conditional POST gets
+# 412 Precondition Failed instead (RFC 9110), so POST searches are not cached
+REVALIDATED_METHODS = ("GET", "HEAD")
+
+# Query fields naming the project area and the configuration of a search
+PROJECT_AREA_FIELDS = ("processArea", "projectArea")
+OSLC_CONTEXT_FIELD = "oslc_config.context"
+
+
+class CacheEntry:
+    """
+    A stored result with the validators it was served with.
+    """
+
+    __slots__ = ("etag", "last_modified", "value", "stored_at")
+
+    def __init__(self, etag, last_modified, value, stored_at):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.value = value
+        self.stored_at = stored_at
+
+    def conditional_headers(self):
+        """
+        If-None-Match / If-Modified-Since headers revalidating this entry.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    Persistent cache of parsed ETM query results with their HTTP validators
+    (ETag, Last-Modified), one SQLite file per server and user.
+
+    ETMClient.fetch_once sends a cached query as a conditional request; a
+    304 Not Modified answer returns the stored result without a body. Only
+    GET and HEAD responses carrying a validator and not marked no-store are
+    kept, so endpoints that never send validators are simply always fetched.
+    """
+
+    def __init__(self, server_url, username, cache_dir=CACHE_DIR):
+        self.server_url = server_url.rstrip("/")
+        digest = hashlib.sha1(f"{self.server_url}|{username}".encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(cache_dir, f"http_cache_{digest}.sqlite3")
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    @staticmethod
+    def cache_key(key, parser_name):
+        """
+        Stable text key for a request_key() tuple and the parser of its result.
+        """
+        return hashlib.sha1(json.dumps([parser_name, list(key)]).encode("utf-8")).hexdigest()
+
+    def lookup(self, cache_key):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT etag, last_modified, value, stored_at FROM responses WHERE cache_key = ?", (cache_key,)).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, value, stored_at = row
+        return CacheEntry(etag, last_modified, json.loads(value), stored_at)
+
+    def store(self, cache_key, key, headers, value):
+        """
+        Stores value under cache_key if the response headers allow it to be
+        revalidated later.
+        """
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not (etag or last_modified) or "no-store" in headers.get("Cache-Control", "").lower():
+            return
+        try:
+            encoded = json.dumps(value)
+        except (TypeError, ValueError):
+            return
+        method, url, params, data = key
+        fields = dict(params + data)
+        project_area_uuid = next((fields[name] for name in PROJECT_AREA_FIELDS if name in fields), None)
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (cache_key, method, url[len(self.server_url):] if url.startswith(self.server_url) else url,
+                 project_area_uuid, fields.get(OSLC_CONTEXT_FIELD), json.dumps([params, data]),
+                 etag, last_modified, encoded, now, now),
+            )
+
+    def revalidated(self, cache_key):
+        """
+        Marks an entry as confirmed unchanged by a 304.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("UPDATE responses SET validated_at = ? WHERE cache_key = ?", (time.time(), cache_key))
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def record_revalidation(self):
+        with self._lock:
+            self.revalidations += 1
+
+    def summary(self):
+        """
+        Hits are revalidations answered 304; misses are queries sent without validators.
+        """
+        return f"HTTP cache hits: {self.hits}, misses: {self.misses}, revalidations: {self.revalidations}"
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def create_http_cache(config, username):
+    """
+    Builds the HttpCache for the configured server and user, or None when
+    http_cache is switched off in config.json.
+    """
+    if not config.get("http_cache", True):
+        return None
+    return HttpCache(config["server_url"], username)
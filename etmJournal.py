@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+from etmCatalog import CACHE_DIR
+
+# Directory holding the progress journals of interrupted scans
+JOURNAL_DIR = os.path.join(CACHE_DIR, "journals")
+
+
+def _truncate_partial_line(path, block_size=4096):
+    """
+    Cuts the file back to the end of its last newline-terminated line.
+    """
+    with open(path, "r+b") as journal_file:
+        end = journal_file.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - block_size)
+            journal_file.seek(start)
+            block = journal_file.read(position - start)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        if position < end:
+            journal_file.truncate(position)
+
+
+class ScanJournal:
+    """
+    Append-only progress journal of a long scan.
+
+    Every completed unit of work (a project area's streams, one count, ...)
+    is written as one JSON line and flushed immediately, so after a crash,
+    Ctrl-C or a dropped VPN a rerun of the same scan can reload the finished
+    units and only fetch the rest. The journal is deleted by finish() once
+    the scan's output has been written.
+
+    Scans are identified by name, server URL and the parameters that change
+    what is scanned (e.g. a project area filter).
+    """
+
+    def __init__(self, scan_name, server_url, params=(), journal_dir=JOURNAL_DIR):
+        identity = json.dumps([scan_name, server_url.rstrip("/"), list(params)])
+        digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(journal_dir, f"{scan_name}_{digest}.jsonl")
+        self.resumed = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    def open(self, restart=False):
+        """
+        Loads the units finished by a previous attempt (unless restart) and
+        opens the journal for appending.
+        """
+        if restart and os.path.exists(self.path):
+            os.remove(self.path)
+        if os.path.exists(self.path):
+            # Drop a last line cut short by the interruption, so new lines are not appended to it
+            _truncate_partial_line(self.path)
+            with open(self.path, "r", encoding="utf-8") as journal_file:
+                for line in journal_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._entries[(entry["kind"], tuple(entry["key"]))] = entry["value"]
+            self.resumed = len(self._entries)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        return self
+
+    def has(self, kind, key):
+        return (kind, tuple(key)) in self._entries
+
+    def get(self, kind, key, default=None):
+        return self._entries.get((kind, tuple(key)), default)
+
+    def record(self, kind, key, value):
+        """
+        Marks a unit as done, persisting its result before returning.
+        """
+        line = json.dumps({"kind": kind, "key": list(key), "value": value})
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._entries[(kind, tuple(key))] = value
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self):
+        """
+        Closes and deletes the journal after the scan completed.
+        """
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,131 @@
+import random
+import threading
+import time
+
+# Defaults used when config.json has no concurrency_limits entry for the server
+DEFAULT_LIMITS = {
+    "initial": 4,             # in-flight requests allowed at start
+    "min": 1,                 # never throttle below this
+    "max": 16,                # server-safe ceiling
+    "decrease_factor": 0.5,   # multiplicative decrease on overload
+    "latency_tolerance": 2.0, # latency above tolerance * baseline counts as a spike
+    "max_retries": 4,         # retries on 429/502/503/504 and timeouts
+    "backoff_base": 0.5,      # seconds, doubled per attempt
+    "backoff_max": 30.0,      # seconds
+    "max_page_size": 1000,    # largest page the page-size tuner may request
+}
+
+# HTTP statuses that mean the server is overloaded and the call can be retried
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter shared by all requests to one ETM server.
+
+    Each successful call with normal latency raises the limit by 1/limit
+    (about +1 per round of requests). Overload (429/503, timeouts or a latency
+    spike) multiplies it by decrease_factor, at most once per baseline latency
+    so one burst of failures only counts once.
+
+    Latency baselines are kept per request kind (release's key, e.g. endpoint
+    and page size), so a 500-row page is not mistaken for a slow count query.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=16, decrease_factor=0.5, latency_tolerance=2.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self.baselines = {}
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Blocks until a request slot is free.
+        """
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency, overloaded=False, key=None, sample=True):
+        """
+        Frees a slot and adapts the limit from the call's latency and outcome.
+
+        Every answered call moves the baseline (an EWMA), spikes included, so
+        after a lasting latency step the baseline catches up and the limit
+        grows again; a spike only decides whether the limit is decreased.
+        Without sample (calls cancelled or failed without an answer) latency
+        is ignored: the slot is freed and only overloaded is acted on.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            baseline = self.baselines.get(key)
+            if not sample:
+                if overloaded:
+                    self._decrease(baseline)
+                self._condition.notify_all()
+                return
+            spike = baseline is not None and latency > baseline * self.latency_tolerance
+            if not overloaded:
+                self.baselines[key] = latency if baseline is None else 0.9 * baseline + 0.1 * latency
+            if overloaded or spike:
+                self._decrease(baseline)
+            else:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._condition.notify_all()
+
+    def _decrease(self, baseline):
+        now = time.monotonic()
+        if now - self._last_decrease < (baseline or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.minimum), self.limit * self.decrease_factor)
+        self.decreases += 1
+
+    def summary(self):
+        return f"concurrency limit: {int(self.limit)} (min {self.minimum}, max {self.maximum}), decreases: {self.decreases}"
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    """
+    Full-jitter exponential backoff: a random delay in [0, min(cap, base * 2**attempt)].
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_after_delay(response, cap=30.0):
+    """
+    Seconds requested by a Retry-After header, or None.
+    """
+    value = response.headers.get("Retry-After")
+    if value is None or not value.strip().isdigit():
+        return None
+    return min(cap, float(value))
+
+
+def server_limits(config, server_url):
+    """
+    Merges the defaults with concurrency_limits["default"] and the entry for
+    server_url from config.json.
+    """
+    configured = config.get("concurrency_limits", {})
+    limits = dict(DEFAULT_LIMITS)
+    limits.update(configured.get("default", {}))
+    limits.update(configured.get(server_url.rstrip("/"), {}))
+    return limits
+
+
+def create_limiter(limits):
+    return AdaptiveLimiter(
+        initial=limits["initial"],
+        minimum=limits["min"],
+        maximum=limits["max"],
+        decrease_factor=limits["decrease_factor"],
+        latency_tolerance=limits["latency_tolerance"],
+    )
@@ -0,0 +1,132 @@
+import argparse
+import csv
+import json
+import time
+from etmClient import load_config, prompt_client
+from etmCounts import ARTIFACT_ENDPOINTS, FULL_PAGE_SIZE, POST_HEADERS, full_page_request_body
+from etmPageSize import create_page_size_tuner
+from etmPaging import DEFAULT_PAGE_WORKERS, iter_decoded_pages, iter_pages
+from etmXml import parse_page
+
+# Artifact types that can be listed in full (form-encoded POST searches)
+LISTABLE_ARTIFACTS = ("test_case", "test_case_execution_record")
+
+
+def _compact(fields):
+    """
+    Keeps only the scalar fields of a record.
+    """
+    return {key: value for key, value in fields if value is not None and not isinstance(value, (dict, list))}
+
+
+def parse_xml_listing_page(content):
+    """
+    Parses one XML pagedSearchResult page into (records, total_size).
+
+    Each of the first resultSetSize <results> elements becomes a dict of its
+    leaf child elements' text. Uses lxml when installed (see etmXml).
+    """
+    return parse_page(content)
+
+
+def parse_json_listing_page(content):
+    """
+    Parses one JSON pagedSearchResult page into (records, total_size).
+
+    Records are read from soapenv:Body.response.returnValue.value.results.
+    """
+    value = json.loads(content)["soapenv:Body"]["response"]["returnValue"]["value"]
+    results = value.get("results", [])
+    if isinstance(results, dict):
+        results = [results]
+    records = [_compact(result.items()) for result in results]
+    total_size = value.get("totalSize")
+    return records, int(total_size) if total_size is not None else None
+
+
+def iter_artifacts(client, artifact, project_area_uuid, oslc_id, page_size=FULL_PAGE_SIZE, max_workers=DEFAULT_PAGE_WORKERS,
+                   decode_processes=0, tuner=None):
+    """
+    Lazily yields every record of one artifact type in a project area stream.
+
+    totalSize is read from the first page; the remaining pages are fetched
+    concurrently and records come out in page order. With decode_processes
+    the pages are parsed on that many worker processes instead of in the
+    I/O threads. With a PageSizeTuner the page size is the tuner's pick for
+    the endpoint.
+    """
+    if artifact not in LISTABLE_ARTIFACTS:
+        raise ValueError(f"Full listings are not supported for {artifact}")
+    _, path = ARTIFACT_ENDPOINTS[artifact]
+    url = f"{client.server_url}{path}"
+    on_page = None
+    if tuner is not None:
+        page_size = tuner.page_size(path, page_size)
+        on_page = tuner.observer(path, page_size)
+    parse = parse_json_listing_page if artifact == "test_case_execution_record" else parse_xml_listing_page
+
+    def fetch_raw_page(page):
+        body = full_page_request_body(project_area_uuid, oslc_id, page_size, page)
+        response = client.post(url, data=body, headers=POST_HEADERS[artifact])
+        response.raise_for_status()
+        return response.content
+
+    if decode_processes:
+        return iter_decoded_pages(fetch_raw_page, parse, page_size, max_workers, decode_processes, on_page, client.service_time)
+    return iter_pages(lambda page: parse(fetch_raw_page(page)), page_size, max_workers, on_page=on_page, clock=client.service_time)
+
+
+def iter_test_cases(client, project_area_uuid, oslc_id, page_size=FULL_PAGE_SIZE, max_workers=DEFAULT_PAGE_WORKERS):
+    return iter_artifacts(client, "test_case", project_area_uuid, oslc_id, page_size, max_workers)
+
+
+def iter_test_case_execution_records(client, project_area_uuid, oslc_id, page_size=FULL_PAGE_SIZE, max_workers=DEFAULT_PAGE_WORKERS):
+    return iter_artifacts(client, "test_case_execution_record", project_area_uuid, oslc_id, page_size, max_workers)
+
+
+def export_csv(records, file_name):
+    """
+    Writes records to a CSV file as they arrive; columns come from the first
+    record, later unknown fields are dropped. Returns the number of rows.
+    """
+    rows = 0
+    with open(file_name, "w", newline="", encoding="utf-8") as csv_file:
+        writer = None
+        for record in records:
+            if writer is None:
+                writer = csv.DictWriter(csv_file, fieldnames=list(record.keys()), extrasaction="ignore")
+                writer.writeheader()
+            writer.writerow(record)
+            rows += 1
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the full listing of test cases or TCERs of one stream")
+    parser.add_argument("artifact", choices=LISTABLE_ARTIFACTS)
+    parser.add_argument("output", help="CSV file to write")
+    parser.add_argument("--stream", metavar="PA_UUID:OSLC_ID",
+                        help="stream to list; defaults to the pair in config.json")
+    parser.add_argument("--page-size", type=int,
+                        help="fixed page size (default: tuned per endpoint, starting from 500)")
+    parser.add_argument("--workers", type=int, help="concurrent page requests (default: config page_workers)")
+    parser.add_argument("--decode-processes", type=int,
+                        help="processes parsing the pages, 0 to parse in the I/O threads (default: config decode_processes)")
+    args = parser.parse_args()
+
+    config = load_config()
+    client = prompt_client(config)
+    project_area_uuid, oslc_id = args.stream.split(":", 1) if args.stream else (config["project_area_id"], config["Project_Area_Stream_OSLC_ID"])
+    workers = args.workers or config.get("page_workers", DEFAULT_PAGE_WORKERS)
+    decode_processes = args.decode_processes if args.decode_processes is not None else config.get("decode_processes", 0)
+
+    tuner = None if args.page_size else create_page_size_tuner(config, client)
+
+    start = time.time()
+    records = iter_artifacts(client, args.artifact, project_area_uuid, oslc_id, args.page_size or FULL_PAGE_SIZE, workers, decode_processes, tuner)
+    rows = export_csv(records, args.output)
+    print(f"Exported {rows} {args.artifact} records to {args.output} in {time.time() - start:.1f}s")
+    if tuner is not None:
+        tuner.save()
+        print(f"Page sizes: {tuner.summary()}")
+    print(client.connection_summary())
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from etmCatalog import CACHE_DIR
+
+# Page sizes the tuner moves between, smallest first
+PAGE_SIZE_STEPS = (25, 50, 100, 200, 500, 1000, 2000)
+
+# Full pages measured at a size before it is compared with its neighbours
+MIN_SAMPLES = 3
+
+# Weight of a new measurement in the moving average of records/second
+SMOOTHING = 0.3
+
+
+class PageSizeTuner:
+    """
+    Picks the page size per paged search endpoint that gives the most
+    records per second, persisted per server for later runs.
+
+    Every full page fetched is reported with observe(). The tuner keeps a
+    moving average of records/second per page size and hill-climbs: it
+    stays on the best measured size but first tries each untested
+    neighbour on the PAGE_SIZE_STEPS ladder, never going above max_page_size
+    (the server-safe ceiling from concurrency_limits in config.json).
+    A page size is fixed for one enumeration, so the tuner converges over
+    the many enumerations of a sweep or over successive runs.
+    """
+
+    def __init__(self, server_url, max_page_size, cache_dir=CACHE_DIR):
+        self.steps = [step for step in PAGE_SIZE_STEPS if step <= max_page_size] or [max_page_size]
+        digest = hashlib.sha1(server_url.rstrip("/").encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(cache_dir, f"page_sizes_{digest}.json")
+        self._lock = threading.Lock()
+        self._endpoints = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as tuning_file:
+                data = json.load(tuning_file)
+            return {
+                endpoint: {
+                    "page_size": state["page_size"],
+                    "samples": {int(size): sample for size, sample in state["samples"].items()},
+                }
+                for endpoint, state in data["endpoints"].items()
+            }
+        except (OSError, ValueError, KeyError, AttributeError):
+            return {}
+
+    def _snap(self, page_size):
+        """
+        Nearest ladder step to page_size.
+        """
+        return min(self.steps, key=lambda step: abs(step - page_size))
+
+    def _state(self, endpoint, default):
+        state = self._endpoints.get(endpoint)
+        if state is None or state["page_size"] not in self.steps:
+            state = {"page_size": self._snap(default), "samples": (state or {}).get("samples", {})}
+            self._endpoints[endpoint] = state
+        return state
+
+    def page_size(self, endpoint, default):
+        """
+        Page size to use for the next enumeration of an endpoint.
+        """
+        with self._lock:
+            state = self._state(endpoint, default)
+            index = self.steps.index(state["page_size"])
+            for neighbour in self.steps[index + 1:index + 2] + self.steps[max(index - 1, 0):index]:
+                if state["samples"].get(neighbour, [0, 0.0])[0] < MIN_SAMPLES:
+                    return neighbour
+            return state["page_size"]
+
+    def observe(self, endpoint, page_size, records, seconds):
+        """
+        Records one page's throughput. Partial pages (the tail of a listing)
+        say nothing about the page size and are ignored.
+        """
+        if records < page_size or seconds <= 0:
+            return
+        with self._lock:
+            state = self._state(endpoint, page_size)
+            count, average = state["samples"].get(page_size, [0, 0.0])
+            rate = records / seconds
+            average = rate if count == 0 else (1 - SMOOTHING) * average + SMOOTHING * rate
+            state["samples"][page_size] = [count + 1, average]
+
+            measured = {size: sample[1] for size, sample in state["samples"].items()
+                        if sample[0] >= MIN_SAMPLES and size in self.steps}
+            if measured:
+                state["page_size"] = max(measured, key=measured.get)
+
+    def observer(self, endpoint, page_size):
+        """
+        on_page callback for iter_pages reporting to this tuner.
+        """
+        return lambda records, seconds: self.observe(endpoint, page_size, records, seconds)
+
+    def summary(self):
+        with self._lock:
+            return ", ".join(f"{endpoint.rsplit('/', 2)[-2]}: {state['page_size']}" for endpoint, state in self._endpoints.items())
+
+    def save(self):
+        with self._lock:
+            data = {"updated_at": time.time(), "endpoints": self._endpoints}
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as tuning_file:
+                json.dump(data, tuning_file, indent=2)
+            os.replace(temp_path, self.path)
+
+
+def create_page_size_tuner(config, client):
+    """
+    Builds a PageSizeTuner for the client's server, or None when
+    adaptive_page_size is switched off in config.json.
+    """
+    if not config.get("adaptive_page_size", True):
+        return None
+    return PageSizeTuner(client.server_url, client.limits["max_page_size"])
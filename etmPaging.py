@@ -0,0 +1,175 @@
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError, ProcessPoolExecutor, ThreadPoolExecutor
+
+# Concurrent page requests per enumeration
+DEFAULT_PAGE_WORKERS = 4
+
+# Pages fetched ahead of the consumer per worker
+PREFETCH_PER_WORKER = 2
+
+
+def page_count(total_size, page_size):
+    return -(-total_size // page_size)
+
+
+class ProcessPageDecoder:
+    """
+    Decodes raw page bodies into (records, total_size) on a process pool, so
+    XML/JSON parsing is not bound by the GIL of the threads doing the I/O.
+
+    parse must be a module-level function (it is pickled to the workers),
+    e.g. etmListing.parse_xml_listing_page.
+    """
+
+    def __init__(self, parse, processes=None):
+        self.parse = parse
+        self._pool = ProcessPoolExecutor(max_workers=processes)
+
+    def submit(self, content):
+        return self._pool.submit(self.parse, content)
+
+    def close(self):
+        self._pool.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _settle(target, source, transform=None):
+    """
+    Copies the outcome of one future to another that may have been cancelled.
+    """
+    if source.cancelled():
+        target.cancel()
+        return
+    try:
+        error = source.exception()
+        if error is not None:
+            target.set_exception(error)
+        else:
+            result = source.result()
+            target.set_result(transform(result) if transform is not None else result)
+    except InvalidStateError:
+        pass
+
+
+def _timed(fetch_page, clock=time.monotonic):
+    """
+    Wraps fetch_page so it returns (result, seconds taken by clock).
+    """
+    def fetch(page):
+        start = clock()
+        result = fetch_page(page)
+        return result, clock() - start
+    return fetch
+
+
+def _fetch_then_decode(executor, decoder, fetch_page, page, clock=time.monotonic):
+    """
+    Fetches a raw page on the I/O pool and hands it to the decoder as soon as
+    it arrives; the returned future resolves to (decoded page, fetch seconds).
+    """
+    decoded = Future()
+
+    def fetched(io_future):
+        if decoded.cancelled():
+            return
+        if io_future.cancelled() or io_future.exception() is not None:
+            _settle(decoded, io_future)
+            return
+        content, seconds = io_future.result()
+        try:
+            decode_future = decoder.submit(content)
+        except RuntimeError as e:
+            # The decoder has been shut down because the enumeration ended
+            try:
+                decoded.set_exception(e)
+            except InvalidStateError:
+                pass
+            return
+        decode_future.add_done_callback(lambda future: _settle(decoded, future, lambda value: (value, seconds)))
+
+    executor.submit(_timed(fetch_page, clock), page).add_done_callback(fetched)
+    return decoded
+
+
+def iter_pages(fetch_page, page_size, max_workers=DEFAULT_PAGE_WORKERS, decoder=None, on_page=None, clock=time.monotonic):
+    """
+    Yields the records of every page of a paged search, in page order.
+
+    fetch_page(page) returns (records, total_size); total_size may be None if
+    the response does not carry it. Page 0 is fetched first to learn the
+    total, then the remaining pages are fetched concurrently, keeping at most
+    PREFETCH_PER_WORKER * max_workers pages ahead of the consumer so memory
+    stays bounded however long the listing is. Without a total, pages are
+    walked one by one until a short page comes back.
+
+    With a decoder (ProcessPageDecoder) fetch_page returns the raw body
+    instead, and decoding runs in the decoder's processes while the I/O
+    threads move on to the next page. The same window bounds the pages
+    being fetched or decoded.
+
+    on_page(records, seconds) is called for every page with its record count
+    and the time fetch_page took as measured by clock, a per-thread timer
+    such as ETMClient.service_time.
+    """
+    timed_fetch = _timed(fetch_page, clock)
+
+    def fetch_decoded(page):
+        result, seconds = timed_fetch(page)
+        if decoder is not None:
+            result = decoder.submit(result).result()
+        return result, seconds
+
+    def page_records(result):
+        (records, total_size), seconds = result
+        if on_page is not None:
+            on_page(len(records), seconds)
+        return records, total_size
+
+    records, total_size = page_records(fetch_decoded(0))
+    yield from records
+
+    if total_size is None:
+        page = 1
+        while len(records) >= page_size:
+            records, _ = page_records(fetch_decoded(page))
+            yield from records
+            page += 1
+        return
+
+    pages = page_count(total_size, page_size)
+    if pages <= 1:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, pages - 1))) as executor:
+        pending = deque()
+        next_page = 1
+        try:
+            while next_page < pages or pending:
+                while next_page < pages and len(pending) < max_workers * PREFETCH_PER_WORKER:
+                    if decoder is None:
+                        pending.append(executor.submit(timed_fetch, next_page))
+                    else:
+                        pending.append(_fetch_then_decode(executor, decoder, fetch_page, next_page, clock))
+                    next_page += 1
+                records, _ = page_records(pending.popleft().result())
+                yield from records
+        finally:
+            # Stop prefetching if the consumer gives up or a page fails
+            for future in pending:
+                future.cancel()
+
+
+def iter_decoded_pages(fetch_raw_page, parse, page_size, max_workers=DEFAULT_PAGE_WORKERS, processes=None, on_page=None,
+                       clock=time.monotonic):
+    """
+    iter_pages with parse(content) run on a process pool of its own; fetch_raw_page(page)
+    returns the raw page body. The pool is shut down when the generator ends.
+    """
+    with ProcessPageDecoder(parse, processes) as decoder:
+        yield from iter_pages(fetch_raw_page, page_size, max_workers, decoder, on_page, clock)
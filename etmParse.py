@@ -0,0 +1,250 @@
+import codecs
+import json
+import xml.etree.ElementTree as ET
+
+# Bytes requested from the socket per read while scanning a response
+STREAM_CHUNK_SIZE = 8192
+
+# Unread bytes below which a response is drained (keeping its connection
+# pooled) instead of closing the socket early
+DRAIN_LIMIT = 64 * 1024
+
+# Location of totalSize in the JSON pagedSearchResult answers
+JSON_TOTAL_SIZE_PATH = ("soapenv:Body", "response", "returnValue", "value", "totalSize")
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _release(response, drain_limit):
+    """
+    Gives the connection back to the pool when little is left to read,
+    otherwise closes it so the rest of the body is never downloaded.
+    """
+    content_length = response.headers.get("Content-Length")
+    remaining = None
+    if content_length is not None and content_length.isdigit():
+        remaining = int(content_length) - response.raw.tell()
+    if remaining is not None and remaining <= drain_limit:
+        for _ in response.iter_content(STREAM_CHUNK_SIZE):
+            pass
+    response.close()
+
+
+def _bytes_read(response):
+    raw = getattr(response, "raw", None)
+    return raw.tell() if raw is not None and hasattr(raw, "tell") else len(response.content)
+
+
+def stream_xml_value(response, tags=("totalSize",), stats=None, drain_limit=DRAIN_LIMIT):
+    """
+    Incrementally parses an XML response and returns the text of the first
+    element whose local name is in `tags`, or None if none is present.
+
+    Reading stops as soon as the element closes. Elements that are not
+    wanted are cleared as they complete, so memory stays bounded.
+    Works best on responses requested with stream=True.
+    """
+    parser = ET.XMLPullParser(events=("end",))
+    found = False
+    value = None
+    try:
+        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                if _local_name(element.tag) in tags:
+                    found = True
+                    value = element.text
+                    break
+                element.clear()
+            if found:
+                break
+        else:
+            parser.close()
+    finally:
+        if stats is not None:
+            stats.record_bytes(_bytes_read(response))
+        _release(response, drain_limit)
+    return value
+
+
+class JsonPathScanner:
+    """
+    Minimal incremental JSON tokenizer that reports the scalar value found at
+    one object key path, without building the document.
+    """
+
+    _SCALAR_CHARS = frozenset("0123456789+-.eEtruefalsn")
+
+    def __init__(self, path):
+        self.path = list(path)
+        self.stack = []          # [kind, current key] per open container
+        self.expect_key = False
+        self.in_string = False
+        self.pending_escape = False
+        self.string_buf = []
+        self.scalar_buf = []
+        self.found = False
+        self.value = None
+
+    def _current_path(self):
+        return [key if kind == "object" else None for kind, key in self.stack]
+
+    def _on_value(self, value):
+        if self._current_path() == self.path:
+            self.found = True
+            self.value = value
+
+    def _on_string(self, text):
+        if self.stack and self.stack[-1][0] == "object" and self.expect_key:
+            self.stack[-1][1] = text
+            self.expect_key = False
+        else:
+            self._on_value(text)
+
+    def _finish_scalar(self, text):
+        token = "".join(self.scalar_buf)
+        self.scalar_buf = []
+        try:
+            self._on_value(json.loads(token))
+        except json.JSONDecodeError:
+            raise json.JSONDecodeError(f"Invalid JSON token {token!r}", text, 0)
+
+    def feed(self, text):
+        """
+        Consumes the next piece of decoded text. Returns True once the value
+        at the path has been seen.
+        """
+        i = 0
+        length = len(text)
+        while i < length and not self.found:
+            if self.in_string:
+                if self.pending_escape:
+                    # Escape sequence split across two chunks
+                    self.string_buf.append(text[i])
+                    self.pending_escape = False
+                    i += 1
+                    continue
+                quote = text.find('"', i)
+                backslash = text.find("\\", i, quote if quote != -1 else length)
+                if backslash != -1:
+                    self.string_buf.append(text[i:backslash + 1])
+                    if backslash + 1 < length:
+                        self.string_buf.append(text[backslash + 1])
+                    else:
+                        self.pending_escape = True
+                    i = backslash + 2
+                    continue
+                if quote == -1:
+                    self.string_buf.append(text[i:])
+                    i = length
+                    continue
+                self.string_buf.append(text[i:quote])
+                self.in_string = False
+                raw = "".join(self.string_buf)
+                self.string_buf = []
+                self._on_string(json.loads(f'"{raw}"'))
+                i = quote + 1
+                continue
+
+            char = text[i]
+            if char in self._SCALAR_CHARS:
+                self.scalar_buf.append(char)
+                i += 1
+                continue
+            if self.scalar_buf:
+                self._finish_scalar(text)
+                if self.found:
+                    break
+            if char == '"':
+                self.in_string = True
+            elif char == "{":
+                self.stack.append(["object", None])
+                self.expect_key = True
+            elif char == "[":
+                self.stack.append(["array", None])
+                self.expect_key = False
+            elif char in "}]":
+                if not self.stack:
+                    raise json.JSONDecodeError("Unbalanced JSON container", text, i)
+                self.stack.pop()
+                self.expect_key = False
+            elif char == ",":
+                self.expect_key = bool(self.stack) and self.stack[-1][0] == "object"
+            elif char not in ": \t\r\n":
+                raise json.JSONDecodeError(f"Unexpected character {char!r}", text, i)
+            i += 1
+        return self.found
+
+
+def stream_json_value(response, path=JSON_TOTAL_SIZE_PATH, stats=None, drain_limit=DRAIN_LIMIT):
+    """
+    Incrementally scans a JSON response and returns the scalar at `path`
+    (a sequence of object keys), or None if it is not present.
+
+    Reading stops as soon as the value is complete.
+    """
+    scanner = JsonPathScanner(path)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+            if scanner.feed(decoder.decode(chunk)):
+                break
+        else:
+            scanner.feed(decoder.decode(b"", final=True) + " ")
+    finally:
+        if stats is not None:
+            stats.record_bytes(_bytes_read(response))
+        _release(response, drain_limit)
+    return scanner.value if scanner.found else None
+
+
+# Namespaced tags of the OSLC service provider catalog (RDF/XML)
+OSLC_SERVICE_PROVIDER = "{http://open-services.net/ns/core#}ServiceProvider"
+OSLC_DETAILS = "{http://open-services.net/ns/core#}details"
+DCTERMS_TITLE = "{http://purl.org/dc/terms/}title"
+RDF_ABOUT = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about"
+RDF_RESOURCE = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}resource"
+
+
+def stream_service_providers(response, stats=None):
+    """
+    Incrementally parses an OSLC service provider catalog and yields one
+    dict per oslc:ServiceProvider with its "title", "about" and "details"
+    URIs. Each provider is cleared once read, so memory stays bounded by
+    one provider however many project areas the catalog lists.
+    """
+    parser = ET.XMLPullParser(events=("end",))
+    try:
+        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                if element.tag != OSLC_SERVICE_PROVIDER:
+                    continue
+                title = element.find(DCTERMS_TITLE)
+                details = element.find(OSLC_DETAILS)
+                yield {
+                    # Titles are rdf:parseType="Literal" and may carry markup
+                    "title": "".join(title.itertext()).strip() if title is not None else None,
+                    "about": element.get(RDF_ABOUT),
+                    "details": details.get(RDF_RESOURCE) if details is not None else None,
+                }
+                element.clear()
+        parser.close()
+    finally:
+        if stats is not None:
+            stats.record_bytes(_bytes_read(response))
+        response.close()
+
+
+def read_json(response, stats=None):
+    """
+    Reads and decodes a whole JSON response, counting the bytes transferred.
+    """
+    try:
+        return json.loads(response.content)
+    finally:
+        if stats is not None:
+            stats.record_bytes(_bytes_read(response))
+        response.close()
@@ -0,0 +1,99 @@
+from etmCatalog import matches_search
+
+# Most names a picker's drop-down lists at once; typing narrows the rest
+MAX_PICKER_RESULTS = 200
+
+# Milliseconds of typing pause before the drop-down list is filtered
+TYPE_AHEAD_DELAY_MS = 150
+
+# Keys that move through or confirm the list rather than change the text
+_NAVIGATION_KEYS = {"Up", "Down", "Left", "Right", "Return", "KP_Enter", "Escape", "Tab", "Home", "End",
+                    "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R"}
+
+
+class TypeAheadPicker:
+    """
+    Turns a ttk.Combobox into an editable type-ahead picker over a
+    CatalogIndex: the drop-down lists the names matching the typed text,
+    at most `limit` of them.
+
+    A keystroke that extends the previous text filters the previous matches
+    instead of searching the index again, and the widget's values are only
+    replaced when the matches changed. on_select(event) runs when a name is
+    picked from the list, or typed in full and confirmed with Return.
+    """
+
+    def __init__(self, combobox, index, on_select, limit=MAX_PICKER_RESULTS, delay_ms=TYPE_AHEAD_DELAY_MS):
+        self.combobox = combobox
+        self.on_select = on_select
+        self.limit = limit
+        self.delay_ms = delay_ms
+        self._pending = None
+        combobox.config(state="normal")
+        combobox.bind("<KeyRelease>", self._on_key)
+        combobox.bind("<Return>", self._on_return)
+        combobox.bind("<KP_Enter>", self._on_return)
+        combobox.bind("<<ComboboxSelected>>", self._on_selected)
+        self.set_index(index)
+
+    def set_index(self, index, keep_text=False):
+        """
+        Switches to another catalog, clearing the typed text unless keep_text
+        is set and the text still names an item.
+        """
+        self.index = index
+        if not keep_text or self.selected() is None:
+            self.combobox.set("")
+        self._text = None
+        self._matches = []
+        self._complete = True
+        self.refresh()
+
+    def selected(self):
+        """
+        The item named by the combobox text, or None if the text names none.
+        """
+        return self.index.by_name.get(self.combobox.get())
+
+    def refresh(self):
+        """
+        Filters the whole index again, after items were added to it.
+        """
+        self._text = None
+        self._filter()
+
+    def _on_key(self, event):
+        if event.keysym in _NAVIGATION_KEYS:
+            return
+        if self._pending is not None:
+            self.combobox.after_cancel(self._pending)
+        self._pending = self.combobox.after(self.delay_ms, self._filter)
+
+    def _filter(self):
+        self._pending = None
+        text = self.combobox.get()
+        if text == self._text:
+            return
+        if self._text and self._complete and text.startswith(self._text):
+            matches = [name for name in self._matches if matches_search(name, text)]
+            complete = True
+        else:
+            matches, complete = self.index.search(text, self.limit)
+        self._text = text
+        self._complete = complete
+        if matches != self._matches:
+            self._matches = matches
+            self.combobox["values"] = matches
+
+    def _on_return(self, event):
+        if self._pending is not None:
+            self.combobox.after_cancel(self._pending)
+            self._filter()
+        if self.selected() is not None:
+            self.on_select(event)
+        elif len(self._matches) == 1:
+            self.combobox.set(self._matches[0])
+            self.on_select(event)
+
+    def _on_selected(self, event):
+        self.on_select(event)
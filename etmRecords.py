@@ -0,0 +1,146 @@
+from dataclasses import dataclass, field
+
+# Compact records for the data the scripts pass around. With __slots__ an
+# instance holds its fields inline instead of in a per-instance dict, which
+# matters for a server sweep creating one record per stream and count.
+# to_dict()/from_dict() use the column names of the CSV and JSON reports
+# and the scripts' dicts; snapshot_row()/from_snapshot_row() follow the
+# column order of the etmSnapshot tables.
+
+
+@dataclass(slots=True)
+class Stream:
+    """
+    A configuration of a project area. kind is "stream", "baseline" or None
+    when the server did not say; only baselines are immutable.
+    """
+
+    name: str
+    oslc_id: str
+    kind: str | None = None
+
+    @property
+    def immutable(self):
+        return self.kind == "baseline"
+
+    def to_dict(self):
+        data = {"Project_Area_Stream_Name": self.name, "Project_Area_Stream_OSLC_ID": self.oslc_id}
+        if self.kind is not None:
+            data["Project_Area_Stream_Type"] = self.kind
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["Project_Area_Stream_Name"], data["Project_Area_Stream_OSLC_ID"], data.get("Project_Area_Stream_Type"))
+
+    def snapshot_row(self, project_area_uuid):
+        return project_area_uuid, self.oslc_id, self.name
+
+    @classmethod
+    def from_snapshot_row(cls, row):
+        _, oslc_id, name = row
+        return cls(name, oslc_id)
+
+
+@dataclass(slots=True)
+class ProjectArea:
+    name: str
+    uuid: str
+    streams: list = field(default_factory=list)
+
+    def to_dict(self, with_streams=False):
+        data = {"Project_Area_Name": self.name, "Project_Area_UUID": self.uuid}
+        if with_streams:
+            data["Streams"] = [stream.to_dict() for stream in self.streams]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["Project_Area_Name"], data["Project_Area_UUID"],
+                   [Stream.from_dict(stream) for stream in data.get("Streams", [])])
+
+    def snapshot_row(self):
+        return self.uuid, self.name
+
+    @classmethod
+    def from_snapshot_row(cls, row):
+        uuid, name = row
+        return cls(name, uuid)
+
+
+@dataclass(slots=True)
+class ArtifactCount:
+    project_area_uuid: str
+    stream_oslc_id: str
+    artifact: str
+    count: int | None = None
+    fetched_at: float | None = None
+
+    def to_dict(self):
+        return {"Project_Area_UUID": self.project_area_uuid, "Project_Area_Stream_OSLC_ID": self.stream_oslc_id,
+                "artifact": self.artifact, "count": self.count, "fetched_at": self.fetched_at}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["Project_Area_UUID"], data["Project_Area_Stream_OSLC_ID"], data["artifact"],
+                   data.get("count"), data.get("fetched_at"))
+
+    def snapshot_row(self):
+        return self.project_area_uuid, self.stream_oslc_id, self.artifact, self.count, self.fetched_at
+
+    @classmethod
+    def from_snapshot_row(cls, row):
+        return cls(*row)
+
+
+def governance_status(count, limit):
+    """
+    "Allowed", "Not allowed" or, for a count that could not be fetched, "Error".
+    """
+    if count is None:
+        return "Error"
+    return "Allowed" if count <= limit else "Not allowed"
+
+
+@dataclass(slots=True)
+class GovernanceResult:
+    """
+    The artifact counts of one stream. counts maps artifact type to its
+    count, None where the count could not be fetched.
+    """
+
+    project_area: ProjectArea
+    stream: Stream
+    counts: dict = field(default_factory=dict)
+
+    def artifact_counts(self, artifacts):
+        for artifact in artifacts:
+            yield ArtifactCount(self.project_area.uuid, self.stream.oslc_id, artifact, self.counts.get(artifact))
+
+    def to_dict(self, limits):
+        """
+        One report row; limits maps each reported artifact type to its governance limit.
+        """
+        row = {
+            "Project_Area_Name": self.project_area.name,
+            "Project_Area_UUID": self.project_area.uuid,
+            "Project_Area_Stream_Name": self.stream.name,
+            "Project_Area_Stream_OSLC_ID": self.stream.oslc_id,
+        }
+        for artifact, limit in limits.items():
+            count = self.counts.get(artifact)
+            row[f"{artifact}_count"] = count
+            row[f"{artifact}_status"] = governance_status(count, limit)
+        return row
+
+    @classmethod
+    def from_dict(cls, row, artifacts):
+        """
+        Reads a report row back; statuses are derived data and are dropped.
+        CSV rows carry counts as strings and empty strings for missing counts.
+        """
+        counts = {}
+        for artifact in artifacts:
+            count = row.get(f"{artifact}_count")
+            counts[artifact] = int(count) if count not in (None, "") else None
+        return cls(ProjectArea(row["Project_Area_Name"], row["Project_Area_UUID"]), Stream.from_dict(row), counts)
@@ -0,0 +1,261 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from etmRecords import ArtifactCount, ProjectArea, Stream
+
+# Default location of the snapshot database (config.json: snapshot_db)
+DEFAULT_SNAPSHOT_PATH = os.path.join("snapshots", "etm_snapshots.sqlite3")
+
+# Rows written per transaction by the background writer
+DEFAULT_BATCH_SIZE = 500
+
+# Seconds the writer waits for more rows before committing a partial batch
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    server_url TEXT NOT NULL,
+    source TEXT NOT NULL,
+    started_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_server ON runs (server_url, started_at);
+
+CREATE TABLE IF NOT EXISTS project_areas (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    project_area_uuid TEXT NOT NULL,
+    project_area_name TEXT NOT NULL,
+    PRIMARY KEY (run_id, project_area_uuid)
+);
+CREATE INDEX IF NOT EXISTS idx_project_areas_uuid ON project_areas (project_area_uuid);
+
+CREATE TABLE IF NOT EXISTS streams (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    project_area_uuid TEXT NOT NULL,
+    stream_oslc_id TEXT NOT NULL,
+    stream_name TEXT NOT NULL,
+    PRIMARY KEY (run_id, project_area_uuid, stream_oslc_id)
+);
+CREATE INDEX IF NOT EXISTS idx_streams_project_area ON streams (project_area_uuid);
+
+CREATE TABLE IF NOT EXISTS artifact_counts (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    project_area_uuid TEXT NOT NULL,
+    stream_oslc_id TEXT NOT NULL,
+    artifact TEXT NOT NULL,
+    count INTEGER,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (run_id, project_area_uuid, stream_oslc_id, artifact)
+);
+CREATE INDEX IF NOT EXISTS idx_artifact_counts_stream ON artifact_counts (project_area_uuid, stream_oslc_id, artifact, fetched_at);
+"""
+
+# Run sources that record the whole catalog of a server; "report" runs
+# record the single stream a report was generated for
+CATALOG_SOURCES = ("sweep", "project_areas")
+SWEEP_SOURCES = ("sweep",)
+
+INSERT_STATEMENTS = {
+    "project_area": "INSERT OR REPLACE INTO project_areas (run_id, project_area_uuid, project_area_name) VALUES (?, ?, ?)",
+    "stream": "INSERT OR REPLACE INTO streams (run_id, project_area_uuid, stream_oslc_id, stream_name) VALUES (?, ?, ?, ?)",
+    "count": "INSERT OR REPLACE INTO artifact_counts (run_id, project_area_uuid, stream_oslc_id, artifact, count, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+}
+
+
+def connect(path=DEFAULT_SNAPSHOT_PATH):
+    """
+    Opens the snapshot database in WAL mode, creating it and its schema if needed.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def start_run(path, server_url, source):
+    """
+    Registers a new run and returns its run_id.
+    """
+    connection = connect(path)
+    try:
+        with connection:
+            cursor = connection.execute(
+                "INSERT INTO runs (server_url, source, started_at) VALUES (?, ?, ?)",
+                (server_url.rstrip("/"), source, time.time()),
+            )
+        return cursor.lastrowid
+    finally:
+        connection.close()
+
+
+class SnapshotWriter:
+    """
+    Records one run's project areas, streams and counts through a background
+    thread that commits them in batches.
+
+    The add_* methods only enqueue, so they are safe to call from any worker
+    thread; close() flushes what is left and waits for the writer.
+    """
+
+    def __init__(self, server_url, source, path=DEFAULT_SNAPSHOT_PATH,
+                 batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.run_id = start_run(path, server_url, source)
+        self.written = 0
+        self.error = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add_project_area(self, project_area_uuid, project_area_name):
+        self._queue.put(("project_area", (self.run_id, project_area_uuid, project_area_name)))
+
+    def add_stream(self, project_area_uuid, stream_oslc_id, stream_name):
+        self._queue.put(("stream", (self.run_id, project_area_uuid, stream_oslc_id, stream_name)))
+
+    def add_count(self, project_area_uuid, stream_oslc_id, artifact, count):
+        self._queue.put(("count", (self.run_id, project_area_uuid, stream_oslc_id, artifact, count, time.time())))
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _run(self):
+        connection = connect(self.path)
+        try:
+            finished = False
+            while not finished:
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        finished = True
+                        break
+                    batch.append(item)
+                if batch and self.error is None:
+                    self._write(connection, batch)
+        finally:
+            connection.close()
+
+    def _write(self, connection, batch):
+        try:
+            with connection:
+                for kind, row in batch:
+                    connection.execute(INSERT_STATEMENTS[kind], row)
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            # Keep draining the queue so producers never block; report on close()
+            self.error = e
+
+
+def create_snapshot_writer(config, source):
+    """
+    Builds a SnapshotWriter for the configured server and snapshot_db path.
+    """
+    return SnapshotWriter(config["server_url"], source, config.get("snapshot_db", DEFAULT_SNAPSHOT_PATH))
+
+
+def latest_counts(path, server_url, project_area_uuid, stream_oslc_id):
+    """
+    Returns {artifact: ArtifactCount} with the most recent count of each
+    artifact type of one stream, across all runs against server_url.
+    """
+    connection = connect(path)
+    try:
+        rows = connection.execute(
+            """
+            SELECT c.project_area_uuid, c.stream_oslc_id, c.artifact, c.count, MAX(c.fetched_at)
+            FROM artifact_counts c JOIN runs r ON r.run_id = c.run_id
+            WHERE r.server_url = ? AND c.project_area_uuid = ? AND c.stream_oslc_id = ? AND c.count IS NOT NULL
+            GROUP BY c.artifact
+            """,
+            (server_url.rstrip("/"), project_area_uuid, stream_oslc_id),
+        ).fetchall()
+    finally:
+        connection.close()
+    return {record.artifact: record for record in map(ArtifactCount.from_snapshot_row, rows)}
+
+
+def _latest_run(connection, server_url, table, sources):
+    placeholders = ", ".join("?" for _ in sources)
+    row = connection.execute(
+        f"""
+        SELECT MAX(r.run_id) FROM runs r
+        WHERE r.server_url = ? AND r.source IN ({placeholders})
+          AND EXISTS (SELECT 1 FROM {table} t WHERE t.run_id = r.run_id)
+        """,
+        (server_url.rstrip("/"), *sources),
+    ).fetchone()
+    return row[0]
+
+
+def _catalog(connection, run_id):
+    project_areas = [
+        ProjectArea.from_snapshot_row(row)
+        for row in connection.execute(
+            "SELECT project_area_uuid, project_area_name FROM project_areas WHERE run_id = ? ORDER BY rowid", (run_id,))
+    ]
+    by_uuid = {area.uuid: area for area in project_areas}
+    for row in connection.execute(
+            "SELECT project_area_uuid, stream_oslc_id, stream_name FROM streams WHERE run_id = ? ORDER BY rowid", (run_id,)):
+        if row[0] in by_uuid:
+            by_uuid[row[0]].streams.append(Stream.from_snapshot_row(row))
+    return project_areas
+
+
+def latest_catalog(path, server_url, with_streams=False, sources=CATALOG_SOURCES):
+    """
+    Returns the project areas (with their "Streams") recorded by the most
+    recent run of one of sources that listed them, in the same dict format
+    the scripts use, or None if no such run has been recorded for
+    server_url. With with_streams only runs that also recorded streams are
+    considered.
+    """
+    connection = connect(path)
+    try:
+        run_id = _latest_run(connection, server_url, "streams" if with_streams else "project_areas", sources)
+        if run_id is None:
+            return None
+        return [area.to_dict(with_streams=True) for area in _catalog(connection, run_id)]
+    finally:
+        connection.close()
+
+
+def latest_sweep(path, server_url, sources=SWEEP_SOURCES):
+    """
+    Returns (project_areas, results) from the most recent run of one of
+    sources that recorded counts: its catalog as ProjectArea records and
+    {(project_area_uuid, oslc_id): {artifact: count}}, or (None, None).
+    """
+    connection = connect(path)
+    try:
+        run_id = _latest_run(connection, server_url, "artifact_counts", sources)
+        if run_id is None:
+            return None, None
+        results = {}
+        for uuid, oslc_id, artifact, count in connection.execute(
+                "SELECT project_area_uuid, stream_oslc_id, artifact, count FROM artifact_counts WHERE run_id = ?", (run_id,)):
+            results.setdefault((uuid, oslc_id), {})[artifact] = count
+        return _catalog(connection, run_id), results
+    finally:
+        connection.close()
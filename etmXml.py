@@ -0,0 +1,115 @@
+import os
+import xml.etree.ElementTree as ET
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Set ETM_XML_PARSER=elementtree to force the standard library parser even
+# when lxml is installed (inherited by decoder processes)
+PARSER_ENV = "ETM_XML_PARSER"
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _leaf_fields(result):
+    """
+    Text of the leaf child elements of one <results> element, by local name.
+    The first element wins when a name repeats, as with find().
+    """
+    fields = {}
+    for child in result:
+        if isinstance(child.tag, str) and len(child) == 0 and child.text is not None:
+            fields.setdefault(_local_name(child.tag), child.text)
+    return fields
+
+
+class ElementTreeBackend:
+    """
+    pagedSearchResult page parser on xml.etree.ElementTree.
+    """
+
+    name = "elementtree"
+
+    def parse_page(self, content):
+        """
+        Returns (records, total_size): the leaf fields of the first
+        resultSetSize <results> elements and totalSize (None if absent).
+        """
+        root = ET.fromstring(content)
+        result_set_size = int(root.findtext('.//resultSetSize') or 0)
+        total_size = root.findtext('.//totalSize')
+        records = [_leaf_fields(result) for result in root.findall('.//results')[:result_set_size]]
+        return records, int(total_size) if total_size else None
+
+
+class LxmlBackend:
+    """
+    The same parser on lxml, with the lookups compiled once as XPath.
+    """
+
+    name = "lxml"
+
+    def __init__(self):
+        self._parser = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True)
+        self._result_set_size = etree.XPath("string((.//resultSetSize)[1])")
+        self._total_size = etree.XPath("string((.//totalSize)[1])")
+        self._results = etree.XPath(".//results")
+
+    def parse_page(self, content):
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        try:
+            root = etree.fromstring(content, self._parser)
+        except etree.XMLSyntaxError as e:
+            # Callers handle malformed pages as ElementTree's ParseError
+            raise ET.ParseError(str(e)) from e
+        result_set_size = int(self._result_set_size(root) or 0)
+        total_size = self._total_size(root)
+        records = [_leaf_fields(result) for result in self._results(root)[:result_set_size]]
+        return records, int(total_size) if total_size else None
+
+
+def available_backends():
+    backends = [ElementTreeBackend()]
+    if etree is not None:
+        backends.append(LxmlBackend())
+    return backends
+
+
+def create_backend(name=None):
+    """
+    Returns the named backend ("lxml" or "elementtree"); by default lxml when
+    it is installed, unless ETM_XML_PARSER says otherwise.
+    """
+    name = (name or os.environ.get(PARSER_ENV) or "auto").lower()
+    if name == "elementtree" or (name == "auto" and etree is None):
+        return ElementTreeBackend()
+    if etree is None:
+        raise ValueError("lxml is not installed")
+    if name in ("lxml", "auto"):
+        return LxmlBackend()
+    raise ValueError(f"Unknown XML parser {name!r}")
+
+
+# Backend used by parse_page (created once per process); an ETM_XML_PARSER
+# that cannot be honoured falls back to ElementTree
+try:
+    _backend = create_backend()
+except ValueError:
+    _backend = ElementTreeBackend()
+
+
+def parse_page(content):
+    """
+    Parses a pagedSearchResult XML page into (records, total_size) with the
+    default backend. Module-level so it can be handed to decoder processes.
+    """
+    return _backend.parse_page(content)
+
+
+def backend_name():
+    return _backend.name
@@ -1,9 +1,11 @@
 import json
 import requests
-from openpyxl import Workbook
+from etmExcel import write_excel
+from etmSnapshot import DEFAULT_SNAPSHOT_PATH, create_snapshot_writer, latest_catalog
 import urllib3
 from datetime import datetime
 import os
+import sys
 
 # Suppress warnings about unverified HTTPS requests
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -66,21 +68,22 @@ def save_to_excel(project_areas):
     # Ensure the Reports folder exists
     os.makedirs("Reports", exist_ok=True)
 
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Project Areas"
-
-    # Add header
-    sheet.append(["Project Area Name", "Project Area UUID"])
-
-    # Write project areas to Excel
-    for area in project_areas:
-        sheet.append([area["Project_Area_Name"], area["Project_Area_UUID"]])
-
-    workbook.save(file_name)
+    # Write project areas to Excel, streaming rows through a write-only workbook
+    rows = ([area["Project_Area_Name"], area["Project_Area_UUID"]] for area in project_areas)
+    write_excel(file_name, [("Project Areas", ["Project Area Name", "Project Area UUID"], rows)])
     print(f"Project areas saved to {file_name}")
 
 # Main Execution
+if "--from-snapshot" in sys.argv:
+    # Rebuild the export from the latest recorded project areas without querying ETM
+    project_areas = latest_catalog(config.get("snapshot_db", DEFAULT_SNAPSHOT_PATH), server_url)
+    if project_areas is not None:
+        print(f"Total number of project areas in the latest snapshot: {len(project_areas)}")
+        save_to_excel(project_areas)
+    else:
+        print("No project areas have been recorded for this server yet.")
+    sys.exit()
+
 user_project_areas = fetch_project_areas()
 if user_project_areas:
     project_areas = parse_project_areas(user_project_areas)
@@ -89,6 +92,11 @@ if user_project_areas:
     # Display the total count in log
     print(f"Total number of project areas fetched: {project_area_count}")
 
+    # Record the list in the snapshot store
+    with create_snapshot_writer(config, "project_areas") as snapshot:
+        for area in project_areas:
+            snapshot.add_project_area(area["Project_Area_UUID"], area["Project_Area_Name"])
+
     # Save project areas to an Excel file
     save_to_excel(project_areas)
 else:
@@ -1,10 +1,17 @@
 import json
 import requests
-from openpyxl import Workbook
+from etmExcel import write_excel
+from etmJournal import ScanJournal
 import urllib3
 from datetime import datetime
 import os
+import sys
 import xml.etree.ElementTree as ET
+from etmCatalog import DEFAULT_PAGE_WORKERS, DEFAULT_PROJECT_AREA_SOURCE, STREAM_PAGE_SIZE, iter_streams
+from etmCatalog import fetch_project_areas as fetch_project_areas_from_source
+from etmClient import create_client
+from etmPageSize import create_page_size_tuner
+from etmSnapshot import DEFAULT_SNAPSHOT_PATH, create_snapshot_writer, latest_catalog
 
 # Suppress warnings about unverified HTTPS requests
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -17,60 +24,42 @@ username = config["username"]
 password = config["password"]
 server_url = config["server_url"]
 
-# API endpoints
-api_url_project_areas = f"{server_url}/qm/service/com.ibm.team.repository.service.internal.webuiInitializer.IWebUIInitializerRestService/initializationData"
-oslc_api_url_template = f"{server_url}/qm/service/com.ibm.rqm.configmanagement.service.rest.IConfigurationManagementRestService/pagedSearchResult?pageSize=100&page=0&projectArea={{Project_Area_UUID}}"
+# One pooled client (keep-alive connections + JSESSIONID) shared by every ETM call
+etm_client = create_client(config, username, password)
+
+# Page sizes tuned per endpoint from measured throughput, kept per server
+page_size_tuner = create_page_size_tuner(config, etm_client)
 
 def fetch_project_areas():
     """
-    Fetches project areas using the API.
+    Fetches project areas from the source set by project_area_source in config.json.
     """
     try:
-        response = requests.get(api_url_project_areas, auth=(username, password), verify=False)
-        response.raise_for_status()
-
-        data = response.json()
-        if 'soapenv:Body' in data and "response" in data['soapenv:Body']:
-            return data['soapenv:Body']["response"]["returnValue"]["value"]["com.ibm.rqm.planning.service.permissionsWebUIInitializer"]["userProjectAreas"]
-        else:
-            print("Invalid response structure.")
+        return fetch_project_areas_from_source(etm_client, config.get("project_area_source", DEFAULT_PROJECT_AREA_SOURCE))
     except requests.exceptions.RequestException as e:
         print(f"Error fetching project areas: {e}")
     except json.JSONDecodeError as e:
         print(f"Error decoding JSON response: {e}")
+    except ET.ParseError as e:
+        print(f"Error parsing the OSLC catalog: {e}")
+    except ValueError as e:
+        print(e)
 
     return []
 
 def fetch_oslc_details(project_area_uuid):
     """
-    Fetches OSLC details for a given project area and retrieves all streams.
+    Fetches every stream of a project area, walking all result pages.
+    Returns None if the streams could not be fetched completely.
     """
-    oslc_url = oslc_api_url_template.replace("{Project_Area_UUID}", project_area_uuid)
     try:
-        response = requests.get(oslc_url, auth=(username, password), verify=False)
-        response.raise_for_status()
-
-        root = ET.fromstring(response.text)
-        result_set_size = int(root.find('.//resultSetSize').text)
-        results = root.findall('.//results')
-
-        streams = []
-        for result in results[:result_set_size]:
-            item_id = result.find("itemId").text if result.find("itemId") is not None else None
-            name = result.find("name").text if result.find("name") is not None else None
-            if item_id and name:
-                streams.append({
-                    "Project_Area_Stream_Name": name,
-                    "Project_Area_Stream_OSLC_ID": item_id
-                })
-
-        return streams
+        return [stream.to_dict() for stream in iter_streams(etm_client, project_area_uuid,
+                config.get("stream_page_size", STREAM_PAGE_SIZE), config.get("page_workers", DEFAULT_PAGE_WORKERS), page_size_tuner)]
     except ET.ParseError as e:
         print(f"Error parsing XML response for Project Area UUID {project_area_uuid}: {e}")
     except requests.exceptions.RequestException as e:
         print(f"Error fetching OSLC details for Project Area UUID {project_area_uuid}: {e}")
-
-    return []
+    return None
 
 def parse_project_areas(user_project_areas):
     """
@@ -81,40 +70,98 @@ def parse_project_areas(user_project_areas):
         for area in user_project_areas if area.get("name") and area.get("itemId")
     ]
 
-def save_to_excel(project_areas):
+def save_to_excel(project_areas, streams_of):
     """
     Saves project areas and streams to an Excel file.
+
+    streams_of(area) yields the streams of one project area. Streams are
+    fetched while the rows are written and rows go straight to a write-only
+    workbook, so neither is held in memory. Returns the number of streams
+    written.
     """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     file_name = f"Reports/Project_Areas_{timestamp}.xlsx"
     os.makedirs("Reports", exist_ok=True)
 
-    workbook = Workbook()
-    sheet = workbook.active
-    sheet.title = "Project Areas"
-    sheet.append(["Project Area Name", "Project Area UUID", "Stream Name", "Stream OSLC ID"])
+    stream_counts = {}
+
+    def stream_rows():
+        for area in project_areas:
+            area_streams = 0
+            for stream in streams_of(area):
+                yield [area["Project_Area_Name"], area["Project_Area_UUID"], stream["Project_Area_Stream_Name"], stream["Project_Area_Stream_OSLC_ID"]]
+                area_streams += 1
+            if not area_streams:
+                yield [area["Project_Area_Name"], area["Project_Area_UUID"], "", ""]
+            stream_counts[area["Project_Area_UUID"]] = area_streams
+
+    # Sheets are written in order, so this runs after every stream is counted
+    def area_rows():
+        for area in project_areas:
+            yield [area["Project_Area_Name"], area["Project_Area_UUID"], stream_counts.get(area["Project_Area_UUID"], 0)]
+
+    write_excel(file_name, [
+        ("Project Areas", ["Project Area Name", "Project Area UUID", "Stream Name", "Stream OSLC ID"], stream_rows()),
+        ("Stream Counts", ["Project Area Name", "Project Area UUID", "Streams"], area_rows()),
+    ])
+    print(f"Project areas and streams saved to {file_name}")
+    return sum(stream_counts.values())
 
-    for area in project_areas:
-        streams = area.get("Streams", [])
-        for stream in streams:
-            sheet.append([area["Project_Area_Name"], area["Project_Area_UUID"], stream["Project_Area_Stream_Name"], stream["Project_Area_Stream_OSLC_ID"]])
-        if not streams:
-            sheet.append([area["Project_Area_Name"], area["Project_Area_UUID"], "", ""])
+def fetch_and_record_streams(snapshot, journal, failed_areas):
+    """
+    Returns a streams_of function that fetches the streams from ETM and
+    records every project area and stream in the snapshot store.
 
-    workbook.save(file_name)
-    print(f"Project areas and streams saved to {file_name}")
+    Each project area whose streams were fetched completely is checkpointed
+    in the journal, so a rerun after an interruption takes them from there.
+    Areas whose streams could not be fetched are appended to failed_areas.
+    """
+    def streams_of(area):
+        snapshot.add_project_area(area["Project_Area_UUID"], area["Project_Area_Name"])
+        streams = journal.get("streams", [area["Project_Area_UUID"]])
+        if streams is None:
+            streams = fetch_oslc_details(area["Project_Area_UUID"])
+            if streams is None:
+                failed_areas.append(area)
+                return
+            journal.record("streams", [area["Project_Area_UUID"]], streams)
+        for stream in streams:
+            snapshot.add_stream(area["Project_Area_UUID"], stream["Project_Area_Stream_OSLC_ID"], stream["Project_Area_Stream_Name"])
+            yield stream
+    return streams_of
 
 # Main Execution
+if "--from-snapshot" in sys.argv:
+    # Rebuild the export from the latest recorded catalog without querying ETM
+    project_areas = latest_catalog(config.get("snapshot_db", DEFAULT_SNAPSHOT_PATH), server_url, with_streams=True)
+    if project_areas is not None:
+        total_streams = save_to_excel(project_areas, lambda area: area["Streams"])
+        print(f"Total number of streams in the latest snapshot: {total_streams}")
+    else:
+        print("No project areas have been recorded for this server yet.")
+    sys.exit()
+
 user_project_areas = fetch_project_areas()
 if user_project_areas:
     project_areas = parse_project_areas(user_project_areas)
 
-    for area in project_areas:
-        area["Streams"] = fetch_oslc_details(area["Project_Area_UUID"])
-
-    total_streams = sum(len(area.get("Streams", [])) for area in project_areas)
+    # Run with --restart to ignore the progress of an interrupted run
+    failed_areas = []
+    with ScanJournal("project_area_streams", server_url).open("--restart" in sys.argv) as journal:
+        if journal.resumed:
+            print(f"Resuming interrupted run: {journal.resumed} project areas already done")
+        with create_snapshot_writer(config, "project_areas") as snapshot:
+            total_streams = save_to_excel(project_areas, fetch_and_record_streams(snapshot, journal, failed_areas))
+        # Keep the journal after failures so a rerun fetches only the missing areas
+        if not failed_areas:
+            journal.finish()
     print(f"Total number of streams fetched: {total_streams}")
-
-    save_to_excel(project_areas)
+    if page_size_tuner is not None:
+        page_size_tuner.save()
+        print(f"Page sizes: {page_size_tuner.summary()}")
+    print(etm_client.connection_summary())
+    if failed_areas:
+        print(f"Streams of {len(failed_areas)} project areas could not be fetched; run again to retry them")
+        sys.exit(1)
 else:
     print("Failed to fetch or parse project areas.")
@@ -0,0 +1,268 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from etmCatalog import DEFAULT_PROJECT_AREA_SOURCE, fetch_project_areas, fetch_streams, parse_project_areas
+from etmClient import DEFAULT_POOL_SIZE, load_config, prompt_client
+from etmCounts import ARTIFACT_LABELS, ARTIFACT_TYPES, GOVERNANCE_LIMIT_KEYS, fetch_artifact_count
+from etmExcel import write_excel
+from etmJournal import ScanJournal
+from etmLimiter import server_limits
+from etmPageSize import create_page_size_tuner
+from etmRecords import GovernanceResult, ProjectArea, Stream, governance_status
+from etmSnapshot import DEFAULT_SNAPSHOT_PATH, create_snapshot_writer, latest_sweep
+
+def bounded_map(fn, items, max_workers):
+    """
+    Applies fn to every item on a thread pool, keeping at most 2 * max_workers
+    calls queued so huge task lists are never materialised.
+    Yields (item, result, error) in completion order.
+    """
+    def outcome(future):
+        try:
+            return future.item, future.result(), None
+        except Exception as e:
+            return future.item, None, e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for item in items:
+            if len(pending) >= max_workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield outcome(future)
+            future = executor.submit(fn, item)
+            future.item = item
+            pending.add(future)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield outcome(future)
+
+
+def collect_streams(client, project_areas, workers, journal=None, tuner=None, failures=None):
+    """
+    Fetches the streams of every ProjectArea concurrently into area.streams.
+    Areas already finished in the journal are not fetched again; areas whose
+    streams could not be fetched are appended to failures if given.
+    """
+    def fetch(area):
+        return fetch_streams(client, area.uuid, tuner=tuner)
+
+    pending = []
+    for area in project_areas:
+        if journal is not None and journal.has("streams", [area.uuid]):
+            area.streams = [Stream.from_dict(stream) for stream in journal.get("streams", [area.uuid])]
+        else:
+            pending.append(area)
+
+    for area, streams, error in bounded_map(fetch, pending, workers):
+        if error is not None:
+            print(f"Error fetching streams for {area.name}: {error}")
+            streams = []
+            if failures is not None:
+                failures.append(area)
+        elif journal is not None:
+            journal.record("streams", [area.uuid], [stream.to_dict() for stream in streams])
+        area.streams = streams
+
+
+def record_catalog(snapshot, project_areas):
+    """
+    Adds the project areas and their streams to a SnapshotWriter.
+    """
+    for area in project_areas:
+        snapshot.add_project_area(*area.snapshot_row())
+        for stream in area.streams:
+            snapshot.add_stream(*stream.snapshot_row(area.uuid))
+
+
+def sweep_counts(client, project_areas, workers, artifacts=ARTIFACT_TYPES, snapshot=None, journal=None, failures=None):
+    """
+    Fetches every artifact count for every (project area, stream) pair,
+    recording each one in the snapshot writer if given. Counts already
+    finished in the journal are reused; failed counts, including a response
+    without totalSize, are never journaled, so a resumed sweep retries them;
+    their tasks are appended to failures if given. Baseline counts go through
+    the client's permanent BaselineCountCache.
+    Returns {(project_area_uuid, oslc_id): {artifact: count or None}}.
+    """
+    all_tasks = (
+        (area.uuid, stream.oslc_id, artifact)
+        for area in project_areas
+        for stream in area.streams
+        for artifact in artifacts
+    )
+    total = sum(len(area.streams) for area in project_areas) * len(artifacts)
+
+    # Baseline counts never change and come from the permanent cache once known
+    baselines = {stream.oslc_id for area in project_areas for stream in area.streams if stream.immutable}
+    results = {}
+    done = 0
+
+    def record(project_area_uuid, oslc_id, artifact, count):
+        results.setdefault((project_area_uuid, oslc_id), {})[artifact] = count
+        if snapshot is not None:
+            snapshot.add_count(project_area_uuid, oslc_id, artifact, count)
+
+    def unfinished(tasks):
+        nonlocal done
+        for task in tasks:
+            if journal is not None and journal.has("count", task):
+                record(*task, journal.get("count", task))
+                done += 1
+            else:
+                yield task
+
+    def fetch(task):
+        project_area_uuid, oslc_id, artifact = task
+        return fetch_artifact_count(client, artifact, project_area_uuid, oslc_id, immutable=oslc_id in baselines)
+
+    for task, count, error in bounded_map(fetch, unfinished(all_tasks), workers):
+        project_area_uuid, oslc_id, artifact = task
+        if error is None and count is None:
+            error = "no totalSize in the response"
+        if error is not None:
+            print(f"Error fetching {artifact} count for {project_area_uuid}/{oslc_id}: {error}")
+            if failures is not None:
+                failures.append(task)
+        elif journal is not None:
+            journal.record("count", task, count)
+        record(project_area_uuid, oslc_id, artifact, count)
+        done += 1
+        if done % 500 == 0 or done == total:
+            print(f"Fetched {done}/{total} counts")
+    return results
+
+
+def build_results(project_areas, results):
+    """
+    Pairs every stream with its counts as GovernanceResult records, in
+    project area order.
+    """
+    return [
+        GovernanceResult(area, stream, results.get((area.uuid, stream.oslc_id), {}))
+        for area in project_areas
+        for stream in area.streams
+    ]
+
+
+def governance_limits(config, artifacts=ARTIFACT_TYPES):
+    return {artifact: config[GOVERNANCE_LIMIT_KEYS[artifact]] for artifact in artifacts}
+
+
+def artifact_count_rows(results, limits):
+    """
+    Unpivots the sweep into one row per (stream, artifact type).
+    """
+    for result in results:
+        for record in result.artifact_counts(limits):
+            yield [result.project_area.name, result.stream.name, ARTIFACT_LABELS[record.artifact],
+                   record.count, governance_status(record.count, limits[record.artifact])]
+
+
+def write_json_rows(results, limits, json_file):
+    """
+    Writes the report rows as a JSON array, one row per line, without
+    building the whole document in memory.
+    """
+    json_file.write("[")
+    for index, result in enumerate(results):
+        json_file.write(",\n  " if index else "\n  ")
+        json.dump(result.to_dict(limits), json_file)
+    json_file.write("\n]\n" if results else "]\n")
+
+
+def save_results(results, limits, output_dir="Reports"):
+    """
+    Writes the consolidated sweep (GovernanceResult records) as CSV, JSON and
+    Excel files and returns their paths. Rows are serialised one at a time.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    csv_file_name = os.path.join(output_dir, f"Governance_Sweep_{timestamp}.csv")
+    json_file_name = os.path.join(output_dir, f"Governance_Sweep_{timestamp}.json")
+    excel_file_name = os.path.join(output_dir, f"Governance_Sweep_{timestamp}.xlsx")
+
+    fieldnames = list(results[0].to_dict(limits).keys()) if results else ["Project_Area_Name"]
+    with open(csv_file_name, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
+        writer.writeheader()
+        for result in results:
+            writer.writerow(result.to_dict(limits))
+    with open(json_file_name, "w", encoding="utf-8") as json_file:
+        write_json_rows(results, limits, json_file)
+    write_excel(excel_file_name, [
+        ("Streams", fieldnames, (list(result.to_dict(limits).values()) for result in results)),
+        ("Artifact Counts", ["Project Area Name", "Stream Name", "Artifact", "Count", "Status"], artifact_count_rows(results, limits)),
+    ])
+    return csv_file_name, json_file_name, excel_file_name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless data governance sweep over all project areas and streams")
+    parser.add_argument("--workers", type=int, help="worker threads (default: config sweep_workers, else the server's concurrency ceiling)")
+    parser.add_argument("--project-area", action="append", default=[], metavar="NAME_OR_UUID",
+                        help="restrict the sweep to these project areas (repeatable)")
+    parser.add_argument("--output-dir", default="Reports")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore the progress journal of an interrupted sweep and start over")
+    parser.add_argument("--from-snapshot", action="store_true",
+                        help="rebuild the reports from the latest recorded sweep instead of querying ETM")
+    args = parser.parse_args()
+
+    config = load_config()
+    if args.from_snapshot:
+        project_areas, results = latest_sweep(config.get("snapshot_db", DEFAULT_SNAPSHOT_PATH), config["server_url"])
+        if project_areas is None:
+            print("No sweep has been recorded for this server yet.")
+            return
+        csv_file_name, json_file_name, excel_file_name = save_results(build_results(project_areas, results), governance_limits(config), args.output_dir)
+        print(f"Results of the latest snapshot saved to {csv_file_name}, {json_file_name} and {excel_file_name}")
+        return
+
+    # The adaptive limiter decides how many of these workers may hit ETM at once
+    workers = args.workers or config.get("sweep_workers") or server_limits(config, config["server_url"])["max"]
+    client = prompt_client(config, pool_size=max(workers, config.get("connection_pool_size", DEFAULT_POOL_SIZE)))
+
+    start = time.time()
+    user_project_areas = fetch_project_areas(client, config.get("project_area_source", DEFAULT_PROJECT_AREA_SOURCE))
+    project_areas = [ProjectArea.from_dict(area) for area in parse_project_areas(user_project_areas)]
+    if args.project_area:
+        wanted = set(args.project_area)
+        project_areas = [area for area in project_areas if area.name in wanted or area.uuid in wanted]
+    print(f"Sweeping {len(project_areas)} project areas with {workers} workers")
+
+    # Finished units are journaled so an interrupted sweep resumes where it stopped
+    failures = []
+    with ScanJournal("sweep", config["server_url"], sorted(args.project_area)).open(args.restart) as journal:
+        if journal.resumed:
+            print(f"Resuming interrupted sweep: {journal.resumed} units already done")
+        tuner = create_page_size_tuner(config, client)
+        collect_streams(client, project_areas, workers, journal, tuner, failures)
+        if tuner is not None:
+            tuner.save()
+        with create_snapshot_writer(config, "sweep") as snapshot:
+            record_catalog(snapshot, project_areas)
+            results = sweep_counts(client, project_areas, workers, snapshot=snapshot, journal=journal, failures=failures)
+        sweep_results = build_results(project_areas, results)
+        csv_file_name, json_file_name, excel_file_name = save_results(sweep_results, governance_limits(config), args.output_dir)
+        # Keep the journal after failures so a rerun fetches only what is missing
+        if not failures:
+            journal.finish()
+
+    print(f"Sweep of {len(sweep_results)} streams finished in {time.time() - start:.1f}s")
+    print(f"Results saved to {csv_file_name}, {json_file_name} and {excel_file_name}")
+    print(client.connection_summary())
+    if failures:
+        print(f"{len(failures)} project areas or counts could not be fetched; run the sweep again to retry them")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import unittest
+from etmLimiter import AdaptiveLimiter
+
+
+class AdaptiveLimiterTest(unittest.TestCase):
+
+    def call(self, limiter, latency, key="count"):
+        limiter.acquire()
+        limiter.release(latency, key=key)
+
+    def test_limit_recovers_after_latency_step(self):
+        limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=16, latency_tolerance=2.0)
+        self.call(limiter, 0.05)
+        # The endpoint settles at a slower level; the first calls are spikes
+        for _ in range(200):
+            self.call(limiter, 0.2)
+        self.assertGreater(limiter.baselines["count"], 0.15)
+        self.assertEqual(limiter.limit, 16)
+
+    def test_spike_decreases_limit(self):
+        limiter = AdaptiveLimiter(initial=8, minimum=1, maximum=16, latency_tolerance=2.0)
+        self.call(limiter, 0.1)
+        self.call(limiter, 1.0)
+        self.assertLess(limiter.limit, 8)
+
+    def test_unsampled_release_sets_no_baseline(self):
+        limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=16)
+        limiter.acquire()
+        limiter.release(0.0, key="count", sample=False)
+        self.assertNotIn("count", limiter.baselines)
+        self.call(limiter, 0.2)
+        self.call(limiter, 0.2)
+        self.assertGreater(limiter.limit, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()